@@ -0,0 +1,40 @@
+"""Per-message cost of the sparkle roll. Run from the repository root:
+
+    python -m benchmarks.sparkle_rolls
+"""
+import random
+import timeit
+from sparkle.tiers import roller
+
+MESSAGES = 1_000_000  # Message IDs rolled per timing run
+REPEAT = 5
+
+def roll_str(message_id: int):
+    """The previous roll: decimal suffix checks on str(message.id)."""
+    msg_id_str = str(message_id)
+    if msg_id_str.endswith("00000"):
+        return "epic"
+    elif msg_id_str.endswith("0000"):
+        return "rare"
+    elif msg_id_str.endswith("000"):
+        return "regular"
+    return None
+
+def roll_tiers(message_id: int):
+    tier = roller.roll(message_id)
+    return tier.name if tier else None
+
+def benchmark():
+    # Snowflake-sized IDs, plus some guaranteed hits so every tier is exercised
+    ids = [random.randrange(1 << 60, 1 << 61) for _ in range(MESSAGES)]
+    ids[::997] = [message_id - message_id % 1000 for message_id in ids[::997]]
+
+    mismatches = sum(roll_str(message_id) != roll_tiers(message_id) for message_id in ids)
+    print(f"Checked {len(ids):,} IDs: {mismatches} mismatches")
+
+    for name, func in (("str + endswith", roll_str), ("tier modulo", roller.roll)):
+        best = min(timeit.repeat(lambda: [func(message_id) for message_id in ids], number=1, repeat=REPEAT))
+        print(f"{name:>15}: {best / len(ids) * 1e9:.0f} ns per message")
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,23 +1,41 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import sqlite3
 from datetime import datetime, timezone, timedelta
 import asyncio
 import pytz
 import os
 from dotenv import load_dotenv
 from moderation.loader import ModerationBase
+from core.database import get_database
 
 load_dotenv()
 ADMIN_ROLE_ID = int(os.getenv("ADMIN_ROLE_ID"), 0)
 BIRTHDAY_ROLE_ID = 1113751318918602762
 
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS birthdays (
+        user_id INTEGER PRIMARY KEY,
+        birthday TEXT NOT NULL,
+        timezone TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS guild_settings (
+        guild_id INTEGER PRIMARY KEY,
+        channel_id INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS active_birthday_roles (
+        user_id INTEGER,
+        guild_id INTEGER,
+        granted_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, guild_id)
+    );
+"""
+
 class Birthday(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_path = os.path.join(os.path.dirname(__file__), "birthdays.db")
-        self._init_db()
+        self.db = get_database(self.db_path, SCHEMA)
         self.check_birthdays.start()
         self.remove_birthday_roles.start()
     
@@ -25,34 +43,6 @@ class Birthday(commands.Cog):
         self.check_birthdays.cancel()
         self.remove_birthday_roles.cancel()
 
-    def _init_db(self):
-        """Initialize SQLite database."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("""
-                  CREATE TABLE IF NOT EXISTS birthdays (
-                  user_id INTEGER PRIMARY KEY,
-                  birthday TEXT NOT NULL,
-                  timezone TEXT NOT NULL
-                  )
-            """)
-        c.execute("""
-                  CREATE TABLE IF NOT EXISTS guild_settings (
-                  guild_id INTEGER PRIMARY KEY,
-                  channel_id INTEGER
-                  )
-            """)
-        c.execute("""
-                  CREATE TABLE IF NOT EXISTS active_birthday_roles (
-                  user_id INTEGER,
-                  guild_id INTEGER,
-                  granted_at TEXT NOT NULL,
-                  PRIMARY KEY (user_id, guild_id)
-                  )
-            """)
-        conn.commit()
-        conn.close()
-
     async def timezone_autocomplete(self, interaction: discord.Interaction, current: str):
         all_timezones = [
             ("UTC", "UTC"),
@@ -168,26 +158,17 @@ class Birthday(commands.Cog):
             await interaction.response.send_message("Invalid date format! Use MM-DD.", ephemeral=True)
             return
         
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("""
+        await self.db.aexecute("""
                     INSERT INTO birthdays (user_id, birthday, timezone)
                     VALUES (?, ?, ?)
                     ON CONFLICT(user_id) DO UPDATE SET birthday=excluded.birthday, timezone=excluded.timezone
             """, (interaction.user.id, date, timezone))
-        conn.commit()
-        conn.close()
 
         await interaction.response.send_message(f"🎂 Birthday set to '{date}' in timezone '{timezone}'!", ephemeral=True)
 
     @app_commands.command(name="removebirthday", description="Remove your saved birthday.")
     async def removebirthday(self, interaction: discord.Interaction):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("DELETE FROM birthdays WHERE user_id = ?", (interaction.user.id,))
-        changes = conn.total_changes
-        conn.commit()
-        conn.close()
+        changes = (await self.db.aexecute("DELETE FROM birthdays WHERE user_id = ?", (interaction.user.id,))).rowcount
 
         if changes > 0:
             await interaction.response.send_message("Your birthday has been removed.", ephemeral=True)
@@ -202,15 +183,11 @@ class Birthday(commands.Cog):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
         
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("""
+        await self.db.aexecute("""
                     INSERT INTO guild_settings (guild_id, channel_id)
                     VALUES (?, ?)
                     ON CONFLICT(guild_id) DO UPDATE SET channel_id=excluded.channel_id
                     """, (interaction.guild.id, channel.id))
-        conn.commit()
-        conn.close()
 
         await interaction.response.send_message(f"Birthday announcements will be sent in {channel.mention}")
 
@@ -221,11 +198,7 @@ class Birthday(commands.Cog):
             await interaction.response.send_message("Invalid month! Please use a number between 1 and 12.", ephemeral=True)
             return
 
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT user_id, birthday FROM birthdays")
-        rows = c.fetchall()
-        conn.close()
+        rows = await self.db.afetchall("SELECT user_id, birthday FROM birthdays")
 
         if not rows:
             await interaction.response.send_message("No birthdays have been set yet!", ephemeral=True)
@@ -265,10 +238,7 @@ class Birthday(commands.Cog):
     @tasks.loop(minutes=1)
     async def check_birthdays(self):
         now_utc = datetime.now(timezone.utc).replace(second=0, microsecond=0)
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT user_id, birthday, timezone FROM birthdays")
-        users = c.fetchall()
+        users = await self.db.afetchall("SELECT user_id, birthday, timezone FROM birthdays")
 
         for user_id, date_str, timezone_str in users:
             try:
@@ -285,8 +255,7 @@ class Birthday(commands.Cog):
                         if not member:
                             continue
 
-                        c.execute("SELECT channel_id FROM guild_settings WHERE guild_id=?", (guild.id,))
-                        row = c.fetchone()
+                        row = await self.db.afetchone("SELECT channel_id FROM guild_settings WHERE guild_id=?", (guild.id,))
                         if not row:
                             continue
                         channel_id = row[0]
@@ -304,24 +273,18 @@ class Birthday(commands.Cog):
                                     
                                     # Record role grant in database
                                     granted_at = datetime.now(timezone.utc).isoformat()
-                                    c.execute("""
+                                    await self.db.aexecute("""
                                         INSERT INTO active_birthday_roles (user_id, guild_id, granted_at)
                                         VALUES (?, ?, ?)
                                         ON CONFLICT(user_id, guild_id) DO UPDATE SET granted_at=excluded.granted_at
                                     """, (user_id, guild.id, granted_at))
-                                    conn.commit()
                             except Exception:
                                 pass
-
-        conn.close()
     
     @tasks.loop(minutes=5)
     async def remove_birthday_roles(self):
         """Remove birthday roles after 24 hours."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT user_id, guild_id, granted_at FROM active_birthday_roles")
-        active_roles = c.fetchall()
+        active_roles = await self.db.afetchall("SELECT user_id, guild_id, granted_at FROM active_birthday_roles")
         
         now = datetime.now(timezone.utc)
         
@@ -342,10 +305,7 @@ class Birthday(commands.Cog):
                                 pass
                 
                 # Remove from database
-                c.execute("DELETE FROM active_birthday_roles WHERE user_id=? AND guild_id=?", (user_id, guild_id))
-                conn.commit()
-        
-        conn.close()
+                await self.db.aexecute("DELETE FROM active_birthday_roles WHERE user_id=? AND guild_id=?", (user_id, guild_id))
 
     @check_birthdays.before_loop
     async def before_check_birthdays(self):
@@ -5,10 +5,11 @@ from discord.ext import commands
 import asyncio
 import glob
 import traceback
-from xp.database import get_db as get_xp_db
+from core.database import migrate_all, run_blocking
 
-# Import sparkle DB to ensure it exists
-from sparkle.database import get_db as get_sparkle_db
+# Import the XP and sparkle databases so they are registered for migration
+import xp.database
+import sparkle.database
 
 load_dotenv()
 
@@ -19,8 +20,8 @@ bot = commands.Bot(command_prefix="!", intents=discord.Intents.all(), help_comma
 
 async def load_cogs(folder: str):
     """Load all cogs in the folder except utility files"""
-    non_cog_files = {"add_xp.py", "database.py", "utils.py", "__init__.py",
-                     "import_old_data.py", "repair_db.py", "reset_db.py"}
+    non_cog_files = {"add_xp.py", "accumulator.py", "config.py", "database.py", "exclusions.py", "levels.py", "multipliers.py", "recalc.py", "roles.py", "snapshots.py", "utils.py", "__init__.py",
+                     "jsonstream.py", "tiers.py", "wordindex.py", "import_old_data.py", "repair_db.py", "reset_db.py"}
     for file in glob.glob(f"{folder}/*.py"):
         filename = os.path.basename(file)
         if filename in non_cog_files:
@@ -43,22 +44,8 @@ async def load_cogs(folder: str):
 async def on_ready():
     print(f"Logged in as {bot.user}!")
 
-    # Ensure XP database connection works
-    for lifetime in (True, False):
-        try:
-            conn, cur = get_xp_db(lifetime)
-            conn.close()
-            print(f"XP database connection successful (lifetime={lifetime})")
-        except Exception as e:
-            print(f"XP database connection failed (lifetime={lifetime}): {e}")
-
-    # Ensure Sparkle DB exists
-    try:
-        conn = get_sparkle_db()
-        conn.close()
-        print("Sparkle database initialized successfully.")
-    except Exception as e:
-        print(f"Failed to initialize sparkle database: {e}")
+    # Register the XP database so migrate_all() creates its schema up front
+    xp.database.get_board()
 
     # Load all cogs
     await load_cogs("commands")
@@ -74,6 +61,9 @@ async def on_ready():
     await load_cogs("events")
     await load_cogs("stats")
 
+    # Open every registered database once, running schema migrations
+    await run_blocking(migrate_all)
+
     # Sync slash commands after loading cogs
     try:
         synced = await bot.tree.sync()
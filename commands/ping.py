@@ -2,13 +2,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import time
-import aiosqlite
 import os
+from core.database import get_database
 
 class Ping(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db_path = os.path.join(os.path.dirname(__file__), "suggestions.db")
+        self.db = get_database(os.path.join(os.path.dirname(__file__), "suggestions.db"))
 
     @app_commands.command(name="ping", description="Check the bot's latency")
     async def ping(self, interaction: discord.Interaction):
@@ -22,9 +22,8 @@ class Ping(commands.Cog):
         # Measure database latency
         db_start = time.perf_counter()
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("SELECT 1")
-                await db.commit()
+            # Round trip through the database thread, as every cog's queries do
+            await self.db.afetchone("SELECT 1")
         except Exception:
             db_latency = "Error"
         else:
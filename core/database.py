@@ -0,0 +1,207 @@
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+import traceback
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+STATEMENT_CACHE_SIZE = 256  # Prepared statements cached per connection
+BUSY_TIMEOUT_MS = 5000
+
+# Set DB_DEBUG_BLOCKING=1 to warn whenever a blocking database call is made
+# from the event loop thread instead of through the async methods.
+DEBUG_BLOCKING = os.getenv("DB_DEBUG_BLOCKING") == "1"
+
+# Every async database call runs on this one thread, so work from different
+# cogs is serialised instead of contending for SQLite's write lock.
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+_databases = {}
+_registry_lock = threading.Lock()
+
+def _check_blocking(path: str, stacklevel: int):
+    if not DEBUG_BLOCKING:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Not on the event loop thread
+    warnings.warn(
+        f"Blocking database call on {path} from the event loop thread",
+        RuntimeWarning,
+        stacklevel=stacklevel + 1,
+    )
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function that touches the database on the database thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+class Database:
+    """A long-lived connection to one SQLite file, shared by every cog using it.
+
+    The connection is opened on first use in WAL mode with synchronous=NORMAL
+    and a prepared-statement cache, and registered schema migrations are run
+    once at that point. Cogs should use run() and the a* methods, which
+    execute on the database thread; the sync methods are for code that is
+    already off the event loop and warn in DB_DEBUG_BLOCKING mode otherwise.
+    """
+
+    def __init__(self, path: str, row_factory=None):
+        self.path = path
+        self.row_factory = row_factory
+        self.lock = threading.RLock()
+        self.migrations = []
+        self.applied = 0  # Number of migrations already run on this connection
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        _check_blocking(self.path, 2)
+        return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        with self.lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            if self.applied < len(self.migrations):
+                self._migrate()
+            return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        return conn
+
+    async def aopen(self):
+        """Open the connection and run pending migrations on the database thread."""
+        await run_blocking(self._open)
+
+    def _migrate(self):
+        for migration in self.migrations[self.applied:]:
+            if callable(migration):
+                migration(self._conn)
+            else:
+                self._conn.executescript(migration)
+            self._conn.commit()
+            self.applied += 1
+
+    def add_migration(self, migration):
+        """Register a schema script (or a callable taking the connection).
+
+        Migrations run once, in registration order, when the connection is
+        first used. Registering the same migration again is a no-op, so cogs
+        can declare their schema every time they load.
+        """
+        with self.lock:
+            if migration not in self.migrations:
+                self.migrations.append(migration)
+
+    @contextmanager
+    def transaction(self):
+        """Hold the connection for a unit of work, committing on success."""
+        _check_blocking(self.path, 3)
+        with self._transaction() as conn:
+            yield conn
+
+    @contextmanager
+    def _transaction(self):
+        with self.lock:
+            conn = self._open()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Run one statement and commit it."""
+        _check_blocking(self.path, 2)
+        with self._transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        _check_blocking(self.path, 2)
+        with self._transaction() as conn:
+            return conn.executemany(sql, seq_of_params)
+
+    def fetchone(self, sql: str, params=()):
+        _check_blocking(self.path, 2)
+        with self.lock:
+            return self._open().execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params=()) -> list:
+        _check_blocking(self.path, 2)
+        with self.lock:
+            return self._open().execute(sql, params).fetchall()
+
+    def _call(self, func, *args, **kwargs):
+        with self._transaction() as conn:
+            return func(conn, *args, **kwargs)
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(conn, *args) in a transaction on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(self._call, func, *args, **kwargs)
+        )
+
+    async def aexecute(self, sql: str, params=()) -> sqlite3.Cursor:
+        return await self.run(lambda conn: conn.execute(sql, params))
+
+    async def aexecutemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        return await self.run(lambda conn: conn.executemany(sql, seq_of_params))
+
+    async def afetchone(self, sql: str, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def afetchall(self, sql: str, params=()) -> list:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self.applied = 0
+
+def get_database(path: str, schema: str | None = None, row_factory=None) -> Database:
+    """Return the shared Database for a file, registering its schema if given."""
+    with _registry_lock:
+        db = _databases.get(path)
+        if db is None:
+            db = Database(path, row_factory=row_factory)
+            _databases[path] = db
+        elif row_factory is not None and db.row_factory is None:
+            db.row_factory = row_factory
+            if db._conn is not None:
+                db._conn.row_factory = row_factory
+    if schema:
+        db.add_migration(schema)
+    return db
+
+def migrate_all():
+    """Open every registered database, running pending migrations. Call at startup."""
+    for db in list(_databases.values()):
+        try:
+            db._open()
+            print(f"Database ready: {db.path}")
+        except Exception as e:
+            print(f"Failed to open database {db.path}: {e}")
+            traceback.print_exc()
+
+def close_all():
+    for db in list(_databases.values()):
+        db.close()
@@ -0,0 +1,66 @@
+import discord
+from discord.ui import View, Button
+from collections import OrderedDict
+
+PAGE_CACHE_SIZE = 5  # Rendered pages kept per leaderboard message
+
+class LeaderboardView(View):
+    """Previous/next pager that renders pages only when they are shown.
+
+    render_page(page) is an async callable returning (embed, has_next). The
+    most recently rendered pages are kept in a small LRU, which is dropped
+    (returning to the first page) whenever is_stale() reports the data
+    behind it has changed.
+    """
+
+    def __init__(self, render_page, cache_size: int = PAGE_CACHE_SIZE, is_stale=None):
+        super().__init__(timeout=60)
+        self.render_page = render_page
+        self.is_stale = is_stale
+        self.cache_size = cache_size
+        self.pages = OrderedDict()
+        self.current_page = 0
+        self.has_next = False
+
+    async def get_page(self, page: int) -> discord.Embed:
+        if self.is_stale is not None and self.is_stale():
+            self.pages.clear()
+            page = 0
+        if page in self.pages:
+            self.pages.move_to_end(page)
+        else:
+            self.pages[page] = await self.render_page(page)
+            if len(self.pages) > self.cache_size:
+                self.pages.popitem(last=False)
+        embed, self.has_next = self.pages[page]
+        self.current_page = page
+        self.update_button_states()
+        return embed
+
+    async def update_message(self, interaction: discord.Interaction, page: int):
+        embed = await self.get_page(page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    def update_button_states(self):
+        self.previous.disabled = self.current_page == 0
+        self.next.disabled = not self.has_next
+
+    @discord.ui.button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: Button):
+        await self.update_message(interaction, max(0, self.current_page - 1))
+
+    @discord.ui.button(label="➡️ Next", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: Button):
+        page = self.current_page + 1 if self.has_next else self.current_page
+        await self.update_message(interaction, page)
+
+    async def on_timeout(self):
+        for child in self.children:
+            if isinstance(child, Button):
+                child.disabled = True
+
+        if hasattr(self, "message") and self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.NotFound:
+                pass
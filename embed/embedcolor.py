@@ -1,39 +1,33 @@
 import discord
-import sqlite3
+from core.database import get_database
 from discord.ext import commands
 from discord import app_commands
 
 DB_PATH = "embed_colors.db"
 
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_embed_colors (
+        user_id INTEGER PRIMARY KEY,
+        color TEXT
+    );
+"""
+
 class EmbedColor(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.setup_table()
-
+        self.db = get_database(DB_PATH, SCHEMA)
+        # user_id -> colour for every saved row. The whole table is loaded up
+        # front, so a user missing here has no colour set (negative cache).
+        self.colors: dict[int, discord.Color] = {}
 
-    def get_db(self):
-        return sqlite3.connect(DB_PATH)
-    
-    def setup_table(self):
-        db = self.get_db()
-        cursor = db.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_embed_colors (
-                user_id INTEGER PRIMARY KEY,
-                color TEXT
-            )
-        """)
-        db.commit()
-        db.close()
+    async def cog_load(self):
+        rows = await self.db.afetchall("SELECT user_id, color FROM user_embed_colors")
+        self.colors = {user_id: discord.Color(int(color, 16)) for user_id, color in rows if color}
 
     def get_user_color(self, user:discord.User) -> discord.Color:
-        db = self.get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT color FROM user_embed_colors WHERE user_id = ?", (user.id,))
-        result = cursor.fetchone()
-        db.close()
-        if result and result[0]:
-            return discord.Color(int(result[0], 16))
+        color = self.colors.get(user.id)
+        if color is not None:
+            return color
         return user.accent_color or discord.Color.blurple()
 
     @app_commands.command(name="setcolor", description="Set your preferred embed color (hex, e.g. #ff66cc).")
@@ -47,15 +41,12 @@ class EmbedColor(commands.Cog):
             await interaction.response.send_message("Invalid hex format. Example: `#7289da`", ephemeral=True)
             return
         
-        db = self.get_db()
-        cursor = db.cursor()
-        cursor.execute("""
+        await self.db.aexecute("""
             INSERT INTO user_embed_colors (user_id, color)
             VALUES (?, ?)
             ON CONFLICT(user_id) DO UPDATE SET color=excluded.color
         """, (interaction.user.id, hex_color[1:]))
-        db.commit()
-        db.close()
+        self.colors[interaction.user.id] = discord.Color(int(hex_color[1:], 16))
 
         await interaction.response.send_message(f"Your embed color has been set to `{hex_color}`")
 
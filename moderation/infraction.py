@@ -22,13 +22,12 @@ class InfractionCommand(ModerationBase):
                 return
 
             try:
-                self.c.execute("""
+                results = await self.db.afetchall("""
                     SELECT id, user_id, type, reason, moderator_id, timestamp
                     FROM infractions
                     WHERE user_id=? AND guild_id=?
                     ORDER BY timestamp DESC
                 """, (user_id, ctx.guild.id))
-                results = self.c.fetchall()
             except Exception as e:
                 await ctx.send(f"Database error: {e}")
                 return
@@ -40,13 +39,12 @@ class InfractionCommand(ModerationBase):
 
         elif action == "list":
             try:
-                self.c.execute("""
+                results = await self.db.afetchall("""
                     SELECT id, user_id, type, reason, moderator_id, timestamp
                     FROM infractions
                     WHERE guild_id=?
                     ORDER BY timestamp DESC
                 """, (ctx.guild.id,))
-                results = self.c.fetchall()
             except Exception as e:
                 await ctx.send(f"Database error: {e}")
                 return
@@ -66,8 +64,7 @@ class InfractionCommand(ModerationBase):
                 await ctx.send("Invalid infraction ID.")
                 return
 
-            self.c.execute("DELETE FROM infractions WHERE id=? AND guild_id=?", (inf_id, ctx.guild.id))
-            self.conn.commit()
+            await self.db.aexecute("DELETE FROM infractions WHERE id=? AND guild_id=?", (inf_id, ctx.guild.id))
             await ctx.send(f"Infraction {inf_id} deleted.")
             return
 
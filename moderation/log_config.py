@@ -69,12 +69,11 @@ class LogConfig(ModerationBase):
             return
         
         # Update database
-        self.c.execute("""
+        await self.db.aexecute("""
             INSERT INTO log_config (guild_id, log_type, channel_id)
             VALUES (?, ?, ?)
             ON CONFLICT(guild_id, log_type) DO UPDATE SET channel_id = ?
         """, (ctx.guild.id, log_type, channel.id, channel.id))
-        self.conn.commit()
         
         await ctx.send(f"✅ Set `{log_type}` logging to {channel.mention}")
     
@@ -89,22 +88,20 @@ class LogConfig(ModerationBase):
         """
         log_type = log_type.lower()
         
-        self.c.execute("DELETE FROM log_config WHERE guild_id = ? AND log_type = ?",
-                      (ctx.guild.id, log_type))
+        deleted = await self.db.aexecute("DELETE FROM log_config WHERE guild_id = ? AND log_type = ?",
+                                         (ctx.guild.id, log_type))
         
-        if self.c.rowcount == 0:
+        if deleted.rowcount == 0:
             await ctx.send(f"❌ No logging configured for `{log_type}`.")
         else:
-            self.conn.commit()
             await ctx.send(f"✅ Removed `{log_type}` logging.")
     
     @log.command(name="list")
     @ModerationBase.is_admin()
     async def log_list(self, ctx):
         """List all configured logging for this server"""
-        self.c.execute("SELECT log_type, channel_id FROM log_config WHERE guild_id = ? ORDER BY log_type",
-                      (ctx.guild.id,))
-        results = self.c.fetchall()
+        results = await self.db.afetchall("SELECT log_type, channel_id FROM log_config WHERE guild_id = ? ORDER BY log_type",
+                                          (ctx.guild.id,))
         
         if not results:
             await ctx.send("❌ No logging configured for this server.\nUse `!log set #channel log_type` to set up logging.")
@@ -203,8 +200,7 @@ class LogConfig(ModerationBase):
     @ModerationBase.is_admin()
     async def log_clear(self, ctx):
         """Remove ALL logging configurations for this server"""
-        self.c.execute("SELECT COUNT(*) FROM log_config WHERE guild_id = ?", (ctx.guild.id,))
-        count = self.c.fetchone()[0]
+        count = (await self.db.afetchone("SELECT COUNT(*) FROM log_config WHERE guild_id = ?", (ctx.guild.id,)))[0]
         
         if count == 0:
             await ctx.send("❌ No logging configured to clear.")
@@ -244,8 +240,7 @@ class LogConfig(ModerationBase):
         if not confirmed["value"]:
             return
         
-        self.c.execute("DELETE FROM log_config WHERE guild_id = ?", (ctx.guild.id,))
-        self.conn.commit()
+        await self.db.aexecute("DELETE FROM log_config WHERE guild_id = ?", (ctx.guild.id,))
         
         await ctx.send(f"✅ Cleared all logging configurations ({count} removed).")
 
@@ -2,51 +2,44 @@ import discord
 from discord.ext import commands
 import sqlite3
 import os
+from core.database import get_database
 from datetime import datetime, timezone
 from typing import Optional
 import traceback
 
+# log_config table for storing logging settings
+LOG_CONFIG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS log_config (
+        guild_id INTEGER NOT NULL,
+        log_type TEXT NOT NULL,
+        channel_id INTEGER NOT NULL,
+        PRIMARY KEY (guild_id, log_type)
+    );
+"""
+
 class Logger(commands.Cog):
     """Core logging system that listens to Discord events and logs them"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db_path = os.path.join(os.path.dirname(__file__), "moderation.db")
-        self.initialize_db()
+        self.db = get_database(self.db_path, LOG_CONFIG_SCHEMA, row_factory=sqlite3.Row)
         # Cache for deleted messages (for bulk delete context)
         self.message_cache = {}
     
-    def initialize_db(self):
-        """Create log_config table for storing logging settings"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS log_config (
-            guild_id INTEGER NOT NULL,
-            log_type TEXT NOT NULL,
-            channel_id INTEGER NOT NULL,
-            PRIMARY KEY (guild_id, log_type)
-        )
-        """)
-        conn.commit()
-        conn.close()
-    
-    def get_log_channel(self, guild_id: int, log_type: str) -> Optional[int]:
+    async def get_log_channel(self, guild_id: int, log_type: str) -> Optional[int]:
         """Get the channel ID for a specific log type in a guild"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT channel_id FROM log_config WHERE guild_id = ? AND log_type = ?",
-                  (guild_id, log_type))
-        result = c.fetchone()
-        conn.close()
-        print(f"[DEBUG] get_log_channel({guild_id}, {log_type}) -> {result}")
-        return result[0] if result else None
+        result = await self.db.afetchone("SELECT channel_id FROM log_config WHERE guild_id = ? AND log_type = ?",
+                                         (guild_id, log_type))
+        channel_id = result[0] if result else None
+        print(f"[DEBUG] get_log_channel({guild_id}, {log_type}) -> {channel_id}")
+        return channel_id
     
     async def send_log(self, guild_id: int, log_type: str, embed: discord.Embed):
         """Send a log embed to the configured channel"""
         print(f"[DEBUG] send_log called: guild_id={guild_id}, log_type={log_type}")
         
-        channel_id = self.get_log_channel(guild_id, log_type)
+        channel_id = await self.get_log_channel(guild_id, log_type)
         if not channel_id:
             print(f"[DEBUG] No channel configured for {log_type} in guild {guild_id}")
             return
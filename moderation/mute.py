@@ -3,8 +3,6 @@ from discord.ext import commands, tasks
 from discord.ui import View, Button
 import asyncio
 import re
-import sqlite3
-import os
 from datetime import timedelta, datetime
 from .loader import ModerationBase
 
@@ -83,22 +81,9 @@ class MuteCommand(ModerationBase):
         await self.log_infraction(ctx.guild.id, user.id, ctx.author.id, "mute", reason)
         await ctx.send(f"{user.mention} has been muted for **{duration}**.")
 
-        db_path = os.path.join(os.path.dirname(__file__), "moderation.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS mutes (
-            user_id INTEGER,
-            guild_id INTEGER,
-            channel_id INTEGER,
-            unmute_time TEXT
-        )
-        """)
         unmute_time = (datetime.utcnow() + delta).isoformat()
-        c.execute("INSERT INTO mutes (user_id, guild_id, channel_id, unmute_time) VALUES (?, ?, ?, ?)",
-                  (user.id, ctx.guild.id, ctx.channel.id, unmute_time))
-        conn.commit()
-        conn.close()
+        await self.db.aexecute("INSERT INTO mutes (user_id, guild_id, channel_id, unmute_time) VALUES (?, ?, ?, ?)",
+                               (user.id, ctx.guild.id, ctx.channel.id, unmute_time))
 
         # Log to logging system
         logger = self.bot.get_cog("Logger")
@@ -111,17 +96,9 @@ class MuteCommand(ModerationBase):
 
     async def schedule_unmute(self, user_id, guild_id, channel_id, delay):
         await asyncio.sleep(delay)
-        db_path = os.path.join(os.path.dirname(__file__), "moderation.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute("SELECT 1 FROM mutes WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
-        exists = c.fetchone()
-        if not exists:
-            conn.close()
+        deleted = await self.db.aexecute("DELETE FROM mutes WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
+        if not deleted.rowcount:
             return
-        c.execute("DELETE FROM mutes WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
-        conn.commit()
-        conn.close()
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return
@@ -148,15 +125,10 @@ class MuteCommand(ModerationBase):
 
     @tasks.loop(minutes=1)
     async def check_mutes(self):
-        db_path = os.path.join(os.path.dirname(__file__), "moderation.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
         now = datetime.utcnow().isoformat()
-        c.execute("SELECT user_id, guild_id, channel_id, unmute_time FROM mutes WHERE unmute_time <= ?", (now,))
-        expired = c.fetchall()
+        expired = await self.db.afetchall("SELECT user_id, guild_id, channel_id, unmute_time FROM mutes WHERE unmute_time <= ?", (now,))
         for user_id, guild_id, channel_id, _ in expired:
             asyncio.create_task(self.schedule_unmute(user_id, guild_id, channel_id, 0))
-        conn.close()
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(MuteCommand(bot))
\ No newline at end of file
@@ -1,8 +1,6 @@
 import discord
 from discord.ext import commands
 from discord.ui import View, Button
-import sqlite3
-import os
 from .loader import ModerationBase
 
 MUTE_ROLE_ID = 982702037517090836
@@ -49,12 +47,7 @@ class UnmuteCommand(ModerationBase):
 
         if mute_role in user.roles:
             await user.remove_roles(mute_role, reason="Manual unmute issued")
-            db_path = os.path.join(os.path.dirname(__file__), "moderation.db")
-            conn = sqlite3.connect(db_path)
-            c = conn.cursor()
-            c.execute("DELETE FROM mutes WHERE user_id = ? AND guild_id = ?", (user.id, ctx.guild.id))
-            conn.commit()
-            conn.close()
+            await self.db.aexecute("DELETE FROM mutes WHERE user_id = ? AND guild_id = ?", (user.id, ctx.guild.id))
             try:
                 await user.send(f"You have been **unmuted** in **{ctx.guild.name}**.")
             except:
@@ -1,17 +1,10 @@
 import sqlite3
 import os
+from core.database import get_database
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "profile.db")
 
-def get_db():
-    db = sqlite3.connect(DB_PATH)
-    db.row_factory = sqlite3.Row
-    return db
-
-def setup_db():
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("""
+SCHEMA = """
     CREATE TABLE IF NOT EXISTS profiles (
         user_id INTEGER PRIMARY KEY,
         pronouns TEXT,
@@ -22,7 +15,15 @@ def setup_db():
         fav_artist TEXT,
         birthday TEXT,
         font_name TEXT
-    )
-    """)
-    db.commit()
-    db.close()
\ No newline at end of file
+    );
+"""
+
+db = get_database(DB_PATH, SCHEMA, row_factory=sqlite3.Row)
+
+def get_db():
+    """Return the shared connection. Do not close it."""
+    return db.conn
+
+async def setup_db():
+    """Open the database, creating the profiles table if needed."""
+    await db.aopen()
@@ -7,7 +7,7 @@ import io
 import os
 import asyncio
 from textwrap import wrap
-from .database import get_db, setup_db
+from .database import db, setup_db
 
 FONTS_PATH = os.path.join(os.path.dirname(__file__), "fonts")
 
@@ -22,7 +22,9 @@ def list_fonts():
 class Profiles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        setup_db()
+
+    async def cog_load(self):
+        await setup_db()
 
     @app_commands.command(name="listfonts", description="List all avaliable fonts for profiles.")
     async def list_fonts_cmd(self, interaction: discord.Interaction):
@@ -74,9 +76,6 @@ class Profiles(commands.Cog):
             await interaction.followup.send("That font is not avaliable. use /listfonts to see the options.")
             return
         
-        db = get_db()
-        cursor = db.cursor()
-
         # Build update query dynamically to only update provided fields
         update_fields = []
         values = []
@@ -108,27 +107,27 @@ class Profiles(commands.Cog):
         
         if not update_fields:
             await interaction.followup.send("Please provide at least one field to update!")
-            db.close()
             return
         
-        # Check if user exists
-        cursor.execute("SELECT user_id FROM profiles WHERE user_id = ?", (interaction.user.id,))
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Update existing profile
-            query = f"UPDATE profiles SET {', '.join(update_fields)} WHERE user_id = ?"
-            values.append(interaction.user.id)
-            cursor.execute(query, values)
-        else:
-            # Insert new profile with only provided fields
-            fields = ["user_id"] + [field.split(" = ")[0] for field in update_fields]
-            placeholders = ["?"] * len(fields)
-            query = f"INSERT INTO profiles ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
-            cursor.execute(query, [interaction.user.id] + values)
+        def save_profile(conn):
+            cursor = conn.cursor()
+
+            # Check if user exists
+            cursor.execute("SELECT user_id FROM profiles WHERE user_id = ?", (interaction.user.id,))
+            exists = cursor.fetchone()
+
+            if exists:
+                # Update existing profile
+                query = f"UPDATE profiles SET {', '.join(update_fields)} WHERE user_id = ?"
+                cursor.execute(query, values + [interaction.user.id])
+            else:
+                # Insert new profile with only provided fields
+                fields = ["user_id"] + [field.split(" = ")[0] for field in update_fields]
+                placeholders = ["?"] * len(fields)
+                query = f"INSERT INTO profiles ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
+                cursor.execute(query, [interaction.user.id] + values)
 
-        db.commit()
-        db.close()
+        await db.run(save_profile)
 
         await interaction.followup.send("Your profile has been saved!")
 
@@ -139,11 +138,7 @@ class Profiles(commands.Cog):
         
         member = member or interaction.user
 
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM profiles WHERE user_id=?", (member.id,))
-        row = cursor.fetchone()
-        db.close()
+        row = await db.afetchone("SELECT * FROM profiles WHERE user_id=?", (member.id,))
 
         if not row:
             await interaction.followup.send("This user hasn't set up a profile yet. Use /setprofile to add information to your profile")
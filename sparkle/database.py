@@ -1,20 +1,99 @@
-import sqlite3
 import os
+import zlib
+from collections import Counter
+from core.database import get_database
+from .tiers import SCORE_SQL
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "sparkle.db")
+FLUSH_INTERVAL = 30  # Seconds between write-behind flushes
+# Named after the score expression so a change to the tier weights builds a fresh index
+SCORE_INDEX = f"idx_sparkles_score_{zlib.crc32(SCORE_SQL.encode()):08x}"
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sparkles (
+        server_id TEXT,
+        user_id TEXT,
+        epic INTEGER DEFAULT 0,
+        rare INTEGER DEFAULT 0,
+        regular INTEGER DEFAULT 0,
+        PRIMARY KEY (server_id, user_id)
+    );
+    CREATE INDEX IF NOT EXISTS {index} ON sparkles (server_id, ({score}) DESC, user_id);
+""".format(index=SCORE_INDEX, score=SCORE_SQL)
+
+UPSERT_SQL = """
+    INSERT INTO sparkles (server_id, user_id, {tier}) VALUES (?, ?, ?)
+    ON CONFLICT(server_id, user_id) DO UPDATE SET {tier} = {tier} + excluded.{tier}
+"""
+
+def drop_stale_score_indexes(conn):
+    """Drop score indexes built for old tier weights; the planner can no longer use them."""
+    stale = [
+        name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name GLOB 'idx_sparkles_score*' AND name != ?",
+            (SCORE_INDEX,)
+        )
+    ]
+    for name in stale:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+db = get_database(DB_PATH, SCHEMA)
+db.add_migration(drop_stale_score_indexes)
 
 def get_db():
-    """Return a SQLite3 connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS sparkles (
-            server_id TEXT,
-            user_id TEXT,
-            epic INTEGER DEFAULT 0,
-            rare INTEGER DEFAULT 0,
-            regular INTEGER DEFAULT 0,
-            PRIMARY KEY (server_id, user_id)
+    """Return the shared SQLite3 connection. Do not close it."""
+    return db.conn
+
+async def get_ranked_rows(server_id: str, after: tuple[int, str] | None = None, limit: int = 50):
+    """Return (user_id, epic, rare, regular, score) rows ranked by score, starting after a (score, user_id) key.
+
+    Reads straight down SCORE_INDEX, so a page costs the same however
+    many users the server has.
+    """
+    columns = f"user_id, epic, rare, regular, {SCORE_SQL} AS score"
+    if after is None:
+        return await db.afetchall(
+            f"SELECT {columns} FROM sparkles WHERE server_id = ? ORDER BY {SCORE_SQL} DESC, user_id LIMIT ?",
+            (server_id, limit)
         )
-    """)
-    conn.commit()
-    return conn
\ No newline at end of file
+    after_score, after_id = after
+    return await db.afetchall(
+        f"""
+        SELECT {columns} FROM sparkles
+        WHERE server_id = ? AND {SCORE_SQL} <= ? AND ({SCORE_SQL} < ? OR user_id > ?)
+        ORDER BY {SCORE_SQL} DESC, user_id LIMIT ?
+        """,
+        (server_id, after_score, after_score, after_id, limit)
+    )
+
+class SparkleBuffer:
+    """Sparkle hits waiting to be written, batched like the XP accumulator.
+
+    add() only bumps an in-memory counter; aflush() writes every pending
+    hit in one transaction. Readers flush first so counts are never behind.
+    """
+
+    def __init__(self):
+        self.pending = Counter()  # (server_id, user_id, tier) -> hits
+
+    def add(self, server_id: str, user_id: str, tier: str):
+        self.pending[(server_id, user_id, tier)] += 1
+
+    def _write(self, conn, pending: Counter):
+        for (server_id, user_id, tier), hits in pending.items():
+            conn.execute(UPSERT_SQL.format(tier=tier), (server_id, user_id, hits))
+
+    async def aflush(self) -> int:
+        """Write pending hits on the database thread, returning how many rows were written."""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, Counter()
+        try:
+            await db.run(self._write, pending)
+        except Exception:
+            # Keep the hits so the next flush retries them
+            self.pending.update(pending)
+            raise
+        return len(pending)
+
+sparkle_buffer = SparkleBuffer()
@@ -2,72 +2,94 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from discord.utils import escape_markdown
-from .database import get_db
-import asyncio
+from core.pagination import LeaderboardView
+from .database import get_ranked_rows, sparkle_buffer
+from .tiers import SPARKLE_TIERS, TIER_EMOJIS
+
+FETCH_SIZE = 50  # Rows read per query while filling a page
+
+class SparklePages:
+    """Keyset-paginated pages of a server's sparkle ranking, current members only.
+
+    Rows come from the database a chunk at a time in (score DESC, user_id)
+    order and members who left are skipped in Python, so no query ever
+    lists the guild's members.
+    """
+
+    def __init__(self, guild: discord.Guild, per_page: int):
+        self.guild = guild
+        self.per_page = per_page
+        self.starts = [None]  # page -> (score, user_id) key the page starts after
+
+    async def fetch(self, page: int):
+        """Return up to per_page member rows for a page and whether another page follows."""
+        after = self.starts[page]
+        rows = []
+        while len(rows) <= self.per_page:
+            chunk = await get_ranked_rows(str(self.guild.id), after, FETCH_SIZE)
+            for row in chunk:
+                if self.guild.get_member(int(row[0])) is not None:
+                    rows.append(row)
+                    if len(rows) > self.per_page:
+                        break
+            if len(chunk) < FETCH_SIZE or len(rows) > self.per_page:
+                break
+            after = (chunk[-1][4], chunk[-1][0])
+
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if has_next and len(self.starts) == page + 1:
+            self.starts.append((rows[-1][4], rows[-1][0]))
+        return rows, has_next
+
 
 class SparkleLeaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Updated emoji mapping
-        self.sparkle_emojis = {
-            "epic": "💫",
-            "rare": "🌟",
-            "regular": "✨"
-        }
+        self.sparkle_emojis = TIER_EMOJIS
 
     @commands.hybrid_command(name="sparkleleaderboard", aliases=["sparklelb"], description="Show server Sparkle leaderboard")
-    @app_commands.describe(limit="Number of users to show (max 20)")
+    @app_commands.describe(limit="Number of users to show per page (max 20)")
     async def sparkle_leaderboard(self, ctx: commands.Context, limit: int = 10):
         limit = max(1, min(20, limit))
-        guild_member_ids = {str(member.id) for member in ctx.guild.members}
+        guild = ctx.guild
 
-        if not guild_member_ids:
-            await ctx.send("This server has no members to display.", ephemeral=True)
-            return
+        # Include sparkles still waiting to be written
+        await sparkle_buffer.aflush()
+        pages = SparklePages(guild, limit)
 
-        def db_task():
-            conn = get_db()
-            placeholders = ",".join(["?"] * len(guild_member_ids))
-            query = f"""
-                SELECT user_id, epic, rare, regular,
-                       (epic + rare + regular) as total
-                FROM sparkles
-                WHERE server_id = ? AND user_id IN ({placeholders})
-                ORDER BY RANDOM()
-                LIMIT ?
-            """
-            params = [str(ctx.guild.id), *guild_member_ids, limit]
-            cursor = conn.execute(query, params)
-            results = cursor.fetchall()
-            conn.close()
-            return results
-
-        results = await asyncio.to_thread(db_task)
-
-        if not results:
+        async def render_page(page_num: int):
+            page_rows, has_next = await pages.fetch(page_num)
+            embed = discord.Embed(
+                title=f"{escape_markdown(guild.name)} Sparkle Leaderboard (Page {page_num + 1})",
+                color=discord.Color.gold()
+            )
+
+            for rank, (user_id, epic, rare, regular, score) in enumerate(page_rows, page_num * limit + 1):
+                user = guild.get_member(int(user_id))
+                sparkles = (
+                    f"{self.sparkle_emojis['epic']} {epic} | "
+                    f"{self.sparkle_emojis['rare']} {rare} | "
+                    f"{self.sparkle_emojis['regular']} {regular} | "
+                    f"**Score:** {score:,}"
+                )
+                # The member may have left since the page was fetched
+                display_name = escape_markdown(user.display_name) if user else f"User {user_id}"
+                embed.add_field(name=f"{rank}. {display_name}", value=sparkles, inline=False)
+                if rank == 1 and user:
+                    embed.set_thumbnail(url=user.display_avatar.url)
+
+            embed.set_footer(text=" | ".join(f"{tier.emoji} {tier.name.title()} = {tier.weight}" for tier in SPARKLE_TIERS))
+            return embed, has_next
+
+        view = LeaderboardView(render_page)
+        first_page = await view.get_page(0)
+
+        if not first_page.fields:
             await ctx.send("No sparkle data available for members of this server.", ephemeral=True)
             return
 
-        embed = discord.Embed(
-            title=f"{escape_markdown(ctx.guild.name)} Random Sparkle List",
-            color=discord.Color.random()
-        )
-
-        for rank, (user_id, epic, rare, regular, total) in enumerate(results, 1):
-            user = ctx.guild.get_member(int(user_id))
-            display_name = escape_markdown(user.display_name) if user else f"Unknown User ({user_id})"
-            sparkles = (
-                f"{self.sparkle_emojis['epic']} {epic} | "
-                f"{self.sparkle_emojis['rare']} {rare} | "
-                f"{self.sparkle_emojis['regular']} {regular} | "
-                f"**Total:** {total}"
-            )
-            embed.add_field(name=f"{rank}. {display_name}", value=sparkles, inline=False)
-            if rank == 1 and user:
-                embed.set_thumbnail(url=user.display_avatar.url)
-
-        embed.set_footer(text="💫 Epic | 🌟 Rare | ✨ Regular")
-        await ctx.send(embed=embed)
+        view.message = await ctx.send(embed=first_page, view=view)
 
 async def setup(bot):
-    await bot.add_cog(SparkleLeaderboard(bot))
\ No newline at end of file
+    await bot.add_cog(SparkleLeaderboard(bot))
@@ -1,52 +1,50 @@
-from discord.ext import commands
-from .database import get_db
-import asyncio
+import traceback
+from discord.ext import commands, tasks
+from .database import sparkle_buffer, FLUSH_INTERVAL
+from .tiers import roller
 
 class Sparkle(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Updated emoji mapping
-        self.chances = {
-            "epic": (100000, "💫", "an **epic sparkle**"),
-            "rare": (10000, "🌟", "a **rare sparkle**"),
-            "regular": (1000, "✨", "a **regular sparkle**")
-        }
-
-    async def _add_sparkle(self, message, sparkle_type):
-        emoji, description = self.chances[sparkle_type][1:]
-        await message.add_reaction(emoji)
+        self.flush_task.start()
+
+    async def cog_unload(self):
+        """Stop the periodic flush and write out anything still pending."""
+        self.flush_task.cancel()
+        try:
+            await sparkle_buffer.aflush()
+        except Exception as e:
+            print(f"Sparkle flush on unload failed: {e}")
+            traceback.print_exc()
+
+    async def _add_sparkle(self, message, tier):
+        await message.add_reaction(tier.emoji)
         await message.reply(
-            f"**{message.author.name}** got {description}! {emoji}",
+            f"**{message.author.name}** got {tier.description}! {tier.emoji}",
             mention_author=False
         )
 
-        def db_task():
-            conn = get_db()
-            conn.execute(
-                f"""INSERT INTO sparkles (server_id, user_id, {sparkle_type})
-                    VALUES (?, ?, 1)
-                    ON CONFLICT(server_id, user_id) DO UPDATE SET
-                    {sparkle_type} = {sparkle_type} + 1""",
-                (str(message.guild.id), str(message.author.id))
-            )
-            conn.commit()
-            conn.close()
-
-        await asyncio.to_thread(db_task)
+        # Written with the next flush
+        sparkle_buffer.add(str(message.guild.id), str(message.author.id), tier.name)
 
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or not message.guild:
             return
-        
-        msg_id_str = str(message.id)
 
-        if msg_id_str.endswith("00000"):  # 1 in 100,000
-            await self._add_sparkle(message, "epic")
-        elif msg_id_str.endswith("0000"):  # 1 in 10,000
-            await self._add_sparkle(message, "rare")
-        elif msg_id_str.endswith("000"):  # 1 in 1,000
-            await self._add_sparkle(message, "regular")
+        # 1 in 100,000 epic, 1 in 10,000 rare, 1 in 1,000 regular (see tiers.py)
+        tier = roller.roll(message.id)
+        if tier is not None:
+            await self._add_sparkle(message, tier)
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_task(self):
+        """Write buffered sparkle hits to sparkle.db"""
+        try:
+            await sparkle_buffer.aflush()
+        except Exception as e:
+            print(f"Sparkle flush failed: {e}")
+            traceback.print_exc()
 
 async def setup(bot):
-    await bot.add_cog(Sparkle(bot))
\ No newline at end of file
+    await bot.add_cog(Sparkle(bot))
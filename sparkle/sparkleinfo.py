@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from .tiers import SPARKLE_TIERS
 
 class SparkleInfo(commands.Cog):
     def __init__(self, bot):
@@ -14,9 +15,11 @@ class SparkleInfo(commands.Cog):
                 "Sparkles are **random reactions** that can appear on messages! "
                 "Sometimes, when you send a message, you might get a sparkle reaction and a little notification.\n\n"
                 "**Types of Sparkles:**\n"
-                "✨ **Regular Sparkle** – Appears randomly (1/1,000 chance per message)\n"
-                "🌟 **Rare Sparkle** – Appears less often (1/10,000 chance per message)\n"
-                "💫**Epic Sparkle** – Extremely rare! (1/100,000 chance per message)\n\n"
+                + "".join(
+                    f"{tier.emoji} **{tier.name.title()} Sparkle** – 1/{tier.modulus:,} chance per message\n"
+                    for tier in reversed(SPARKLE_TIERS)
+                )
+                + "\n"
                 "You can track your sparkles and compare with others using `/sparkleleaderboard`."
             ),
             color=discord.Color.purple()
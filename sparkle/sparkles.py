@@ -1,39 +1,29 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from .database import get_db
-import asyncio
+from .database import db, sparkle_buffer
+from .tiers import TIER_EMOJIS
 
 class Sparkles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sparkle_emojis = {
-            "epic": "💫",
-            "rare": "🌟",
-            "regular": "✨"
-        }
+        self.sparkle_emojis = TIER_EMOJIS
 
     @app_commands.command(name="sparkles", description="Check your sparkle count or another user's")
     @app_commands.describe(user="The user to check sparkle count for (leave empty for yourself)")
     async def sparkles(self, interaction:discord.Interaction, user: discord.User= None):
         user= user or interaction.user
 
-        def db_task():
-            conn = get_db()
-            cursor = conn.execute(
-                """
-                SELECT epic, rare, regular,
-                    (epic + rare + regular) as total
-                FROM sparkles
-                WHERE server_id = ? AND user_id = ?
-                """,
-                (str(interaction.guild.id), str(user.id))
-            )
-            result = cursor.fetchone()
-            conn.close()
-            return result
-        
-        result = await asyncio.to_thread(db_task)
+        await sparkle_buffer.aflush()
+        result = await db.afetchone(
+            """
+            SELECT epic, rare, regular,
+                (epic + rare + regular) as total
+            FROM sparkles
+            WHERE server_id = ? AND user_id = ?
+            """,
+            (str(interaction.guild.id), str(user.id))
+        )
 
         if not result:
             await interaction.response.send_message(f"{user.display_name} has no sparkles yet!", ephemeral=True)
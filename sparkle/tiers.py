@@ -0,0 +1,41 @@
+import math
+from typing import NamedTuple
+
+class SparkleTier(NamedTuple):
+    modulus: int  # A message gets the tier when its ID is a multiple of this (1 in modulus)
+    name: str  # Also the tier's column in the sparkles table
+    emoji: str
+    description: str
+    weight: int  # What one sparkle of the tier is worth on the leaderboard
+
+# Rarest first. Adding a tier also needs a column for it in sparkles (see database.py)
+SPARKLE_TIERS = [
+    SparkleTier(100000, "epic", "💫", "an **epic sparkle**", 100),
+    SparkleTier(10000, "rare", "🌟", "a **rare sparkle**", 10),
+    SparkleTier(1000, "regular", "✨", "a **regular sparkle**", 1),
+]
+TIER_EMOJIS = {tier.name: tier.emoji for tier in SPARKLE_TIERS}
+# Leaderboard score; the leaderboard index is on this exact expression
+SCORE_SQL = " + ".join(f"{tier.name} * {tier.weight}" for tier in SPARKLE_TIERS)
+
+class SparkleRoller:
+    """Picks a message's sparkle tier from its ID with integer arithmetic.
+
+    Every tier's modulus is a multiple of their GCD, so a message whose ID
+    isn't one can't sparkle at all. That rules out almost every message
+    with a single modulo; the rest check the tiers rarest first.
+    """
+
+    def __init__(self, tiers=SPARKLE_TIERS):
+        self.tiers = sorted(tiers, key=lambda tier: tier.modulus, reverse=True)
+        self.gate = math.gcd(*(tier.modulus for tier in self.tiers))
+
+    def roll(self, message_id: int) -> SparkleTier | None:
+        if message_id % self.gate:
+            return None
+        for tier in self.tiers:
+            if message_id % tier.modulus == 0:
+                return tier
+        return None
+
+roller = SparkleRoller()
@@ -2,17 +2,22 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timezone
-import sqlite3
 import os
 import aiohttp
 from aiohttp import web
 import json
 import asyncio
 import aiofiles
+from core.database import get_database
 
 BASE_DIR = os.path.dirname(__file__)
 DB_PATH = os.path.join(BASE_DIR, "stats.db")
 
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS command_usage (id INTEGER PRIMARY KEY, total INTEGER);
+    INSERT OR IGNORE INTO command_usage (id, total) VALUES (1, 0);
+"""
+
 class Stats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -22,8 +27,8 @@ class Stats(commands.Cog):
         if not hasattr(self.bot, "start_time"):
             self.bot.start_time = datetime.now(timezone.utc)
 
-        # Initialize the database
-        self.init_db()
+        # Shared connection; the table is created on first use
+        self.db = get_database(DB_PATH, SCHEMA)
         
         # Stats file path (same directory as stats.py)
         self.stats_file = os.path.join(BASE_DIR, "bot_stats.json")
@@ -35,32 +40,11 @@ class Stats(commands.Cog):
     # -----------------------------
     # Database methods
     # -----------------------------
-    def init_db(self):
-        db = sqlite3.connect(DB_PATH)
-        cursor = db.cursor()
-        cursor.execute(
-            "CREATE TABLE IF NOT EXISTS command_usage (id INTEGER PRIMARY KEY, total INTEGER)"
-        )
-        cursor.execute("SELECT total FROM command_usage WHERE id=1")
-        if cursor.fetchone() is None:
-            cursor.execute("INSERT INTO command_usage (id, total) VALUES (1, 0)")
-        db.commit()
-        db.close()
-
-    def increment_usage(self):
-        db = sqlite3.connect(DB_PATH)
-        cursor = db.cursor()
-        cursor.execute("UPDATE command_usage SET total = total + 1 WHERE id=1")
-        db.commit()
-        db.close()
-
-    def get_usage(self):
-        db = sqlite3.connect(DB_PATH)
-        cursor = db.cursor()
-        cursor.execute("SELECT total FROM command_usage WHERE id=1")
-        total = cursor.fetchone()[0]
-        db.close()
-        return total
+    async def increment_usage(self):
+        await self.db.aexecute("UPDATE command_usage SET total = total + 1 WHERE id=1")
+
+    async def get_usage(self):
+        return (await self.db.afetchone("SELECT total FROM command_usage WHERE id=1"))[0]
 
     # -----------------------------
     # Stats file management
@@ -128,7 +112,7 @@ class Stats(commands.Cog):
             },
             'bot': {
                 'uptime': f"{hours}h {minutes}m {seconds}s",
-                'totalCommands': self.get_usage(),
+                'totalCommands': await self.get_usage(),
                 'serverCount': len(self.bot.guilds),
                 'botUsers': len(self.bot.users),
                 'latency': round(self.bot.latency * 1000),
@@ -163,13 +147,13 @@ class Stats(commands.Cog):
     # -----------------------------
     @commands.Cog.listener()
     async def on_command(self, ctx):
-        self.increment_usage()
+        await self.increment_usage()
 
     @commands.Cog.listener()
     async def on_interaction(self, interaction: discord.Interaction):
         # Only count application commands (slash commands)
         if interaction.type == discord.InteractionType.application_command:
-            self.increment_usage()
+            await self.increment_usage()
 
     # -----------------------------
     # Discord slash command
@@ -185,7 +169,7 @@ class Stats(commands.Cog):
         uptime_str = f"{hours}h {minutes}m {seconds}s"
 
         # Total commands
-        total_commands = self.get_usage()
+        total_commands = await self.get_usage()
 
         # Count channels separately
         text_channels = len([c for c in guild.channels if isinstance(c, discord.TextChannel)])
@@ -1,13 +1,29 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiosqlite
 from datetime import datetime
 import os
 from typing import Optional
+from core.database import get_database
 
 ADMIN_ID = 252130669919076352
 
+DB_PATH = os.path.join(os.path.dirname(__file__), "suggestions.db")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS suggestions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        suggestion TEXT,
+        status TEXT,
+        channel_id INTEGER,
+        reason TEXT,
+        admin_message_id INTEGER
+    );
+"""
+
+db = get_database(DB_PATH, SCHEMA)
+
 class DenyModal(discord.ui.Modal, title="Reason for denying suggestion"):
     reason = discord.ui.TextInput(label="Reason (optional)", style=discord.TextStyle.long, required=False, max_length=2000)
 
@@ -23,10 +39,7 @@ class DenyModal(discord.ui.Modal, title="Reason for denying suggestion"):
     async def on_submit(self, interaction: discord.Interaction):
         reason_text = self.reason.value or None
 
-        db_path = os.path.join(os.path.dirname(__file__), "suggestions.db")
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("UPDATE suggestions SET status = ?, reason = ? WHERE id = ?", ("Denied", reason_text, self.suggestion_id))
-            await db.commit()
+        await db.aexecute("UPDATE suggestions SET status = ?, reason = ? WHERE id = ?", ("Denied", reason_text, self.suggestion_id))
 
         # Respond to modal submit
         await interaction.response.send_message(f"❌ Suggestion #{self.suggestion_id} denied.", ephemeral=False)
@@ -107,10 +120,7 @@ class SuggestionButtons(discord.ui.View):
             await interaction.response.send_message("⚠️ This button is no longer active.", ephemeral=True)
             return
 
-        db_path = os.path.join(os.path.dirname(__file__), "suggestions.db")
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("UPDATE suggestions SET status = ? WHERE id = ?", ("Approved", self.suggestion_id))
-            await db.commit()
+        await db.aexecute("UPDATE suggestions SET status = ? WHERE id = ?", ("Approved", self.suggestion_id))
 
         await interaction.response.send_message(f"✅ Suggestion #{self.suggestion_id} approved.", ephemeral=False)
 
@@ -160,28 +170,12 @@ class SuggestionButtons(discord.ui.View):
 class Suggestion(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = os.path.join(os.path.dirname(__file__), "suggestions.db")
-        self.db = None
+        # Shared connection; the schema (including reason and admin_message_id) is created on first use
+        self.db = db
 
     async def cog_load(self):
-        # Connect to database and ensure schema (including reason and admin_message_id)
-        self.db = await aiosqlite.connect(self.db_path)
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS suggestions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                suggestion TEXT,
-                status TEXT,
-                channel_id INTEGER,
-                reason TEXT,
-                admin_message_id INTEGER
-            )
-        """)
-        await self.db.commit()
-
         # Register persistent views for pending suggestions so buttons keep working after restarts.
-        async with self.db.execute("SELECT id, user_id, suggestion, channel_id, admin_message_id FROM suggestions WHERE status = ?", ("Pending",)) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self.db.afetchall("SELECT id, user_id, suggestion, channel_id, admin_message_id FROM suggestions WHERE status = ?", ("Pending",))
 
         for sid, uid, suggestion_text, channel_id, admin_msg_id in rows:
             # Only re-register views if we have an admin_message_id (message was sent)
@@ -193,22 +187,15 @@ class Suggestion(commands.Cog):
             except Exception:
                 pass
 
-    async def cog_unload(self):
-        if self.db:
-            await self.db.close()
-
     @app_commands.command(name="suggest", description="Submit a suggestion")
     async def suggest(self, interaction: discord.Interaction, idea: str):
         try:
             # Insert suggestion into DB
-            await self.db.execute(
+            cursor = await self.db.aexecute(
                 "INSERT INTO suggestions (user_id, suggestion, status, channel_id) VALUES (?, ?, ?, ?)",
                 (interaction.user.id, idea, "Pending", interaction.channel_id)
             )
-            await self.db.commit()
-
-            async with self.db.execute("SELECT last_insert_rowid()") as cursor:
-                suggestion_id = (await cursor.fetchone())[0]
+            suggestion_id = cursor.lastrowid
 
             await interaction.response.send_message(
                 f"✅ Suggestion submitted! (ID: **{suggestion_id}**)\n> {idea}"
@@ -230,8 +217,7 @@ class Suggestion(commands.Cog):
                 sent = await admin.send(embed=embed, view=view)
 
                 # store admin message id so we can re-register persistent view for it later and edit it
-                await self.db.execute("UPDATE suggestions SET admin_message_id = ? WHERE id = ?", (sent.id, suggestion_id))
-                await self.db.commit()
+                await self.db.aexecute("UPDATE suggestions SET admin_message_id = ? WHERE id = ?", (sent.id, suggestion_id))
 
                 # Register the view so the component interactions will be handled (persistent)
                 try:
@@ -255,10 +241,9 @@ class Suggestion(commands.Cog):
             await interaction.response.send_message("❌ You don't have permission to do that.", ephemeral=True)
             return
 
-        async with self.db.execute(
+        row = await self.db.afetchone(
             "SELECT user_id, suggestion, status, channel_id FROM suggestions WHERE id = ?", (suggestion_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
+        )
 
         if not row:
             await interaction.response.send_message("❌ Suggestion not found.", ephemeral=True)
@@ -269,8 +254,7 @@ class Suggestion(commands.Cog):
             await interaction.response.send_message("⚠️ This suggestion must be approved before marking as complete.", ephemeral=True)
             return
 
-        await self.db.execute("UPDATE suggestions SET status = ? WHERE id = ?", ("Completed", suggestion_id))
-        await self.db.commit()
+        await self.db.aexecute("UPDATE suggestions SET status = ? WHERE id = ?", ("Completed", suggestion_id))
 
         await interaction.response.send_message(f"✅ Suggestion #{suggestion_id} marked as completed!", ephemeral=False)
 
@@ -305,8 +289,7 @@ class Suggestion(commands.Cog):
             query = "SELECT id, user_id, suggestion, status FROM suggestions WHERE status = ? ORDER BY id DESC"
             params = (selected,)
 
-        async with self.db.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
+        rows = await self.db.afetchall(query, params)
 
         if not rows:
             await interaction.response.send_message("No suggestions found.", ephemeral=False)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# Cogs import each other as top-level packages (xp.levels, sparkle.tiers, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ADMIN_ROLE_ID", "1")  # Required in .env; cogs importing moderation.loader read it
+
+from xp import database
+from xp.config import config, DEFAULT_CURVE
+
+@pytest.fixture
+def xp_curve(monkeypatch):
+    """Serve DEFAULT_CURVE without reading xp_config.json. Returns the curve dict to tweak."""
+    curve = dict(DEFAULT_CURVE)
+    monkeypatch.setattr(config, "_curve", curve, raising=False)
+    monkeypatch.setattr(config, "mtime", 1.0)
+    monkeypatch.setattr(config, "last_check", float("inf"))
+    return curve
+
+@pytest.fixture
+def xp_db(tmp_path, monkeypatch):
+    """Point both XP boards at an empty xp.db under tmp_path. Returns its Database."""
+    from xp.accumulator import accumulator
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "xp.db"))
+    db = database.get_board()
+    yield db
+    accumulator.invalidate()
+    db.close()
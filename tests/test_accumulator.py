@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from xp.accumulator import accumulator
+
+GUILD = 42
+
+@pytest.fixture
+def board(xp_db):
+    accumulator.invalidate()
+    xp_db.execute("INSERT INTO xp_lifetime (guild_id, user_id, xp, level, last_message) VALUES (?, '1', 100, 0, 0)", (GUILD,))
+    return lambda: xp_db.fetchone("SELECT xp FROM xp_lifetime WHERE guild_id = ? AND user_id = '1'", (GUILD,))[0]
+
+def aget(create=False):
+    return asyncio.run(accumulator.aget(GUILD, "1", True, create))
+
+def test_write_behind(board):
+    entry = aget()
+    entry.xp += 5
+    accumulator.mark_dirty(GUILD, "1", True, entry)
+    assert board() == 100
+    assert accumulator.flush() == 1
+    assert board() == 105
+
+def test_idle_entries_evicted(board):
+    aget()
+    accumulator.flush()
+    assert (GUILD, "1") in accumulator.entries[True]
+    accumulator.flush()
+    assert (GUILD, "1") not in accumulator.entries[True]
+
+def test_change_to_evicted_entry_kept(board):
+    entry = aget()
+    accumulator.flush()
+    accumulator.flush()  # Evicted while the caller still holds it
+    entry.xp += 5
+    accumulator.mark_dirty(GUILD, "1", True, entry)
+    assert aget() is entry
+    accumulator.flush()
+    assert board() == 105
+
+def test_change_after_rewrite_dropped(board, xp_db):
+    entry = aget()
+    accumulator.exclusive(True, xp_db.execute, "UPDATE xp_lifetime SET xp = 0")
+    entry.xp += 5
+    accumulator.mark_dirty(GUILD, "1", True, entry)
+    accumulator.flush()
+    assert board() == 0
+    assert aget().xp == 0
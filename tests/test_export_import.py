@@ -0,0 +1,77 @@
+import asyncio
+import gzip
+import importlib
+import os
+
+import pytest
+
+from xp.database import board_table
+from xp.export import ExportWriter, ExportXP, UPLOAD_MARGIN
+
+import_cog = importlib.import_module("xp.import")
+
+GUILD = 42
+USERS = 3000
+GZIP_USERS = 30000  # Enough to get past what GzipFile buffers before writing to disk
+
+def fill(db, lifetime=True, guild_id=GUILD, users=USERS, xp=lambda n: (n * 7919) ** 3 % 1000003):
+    db.executemany(
+        f"INSERT INTO {board_table(lifetime)} (guild_id, user_id, xp, level, last_message) VALUES (?, ?, ?, 0, 0)",
+        [(guild_id, str(100000 + n), xp(n)) for n in range(users)]
+    )
+
+def board(db, lifetime=True, guild_id=GUILD):
+    return dict(db.fetchall(f"SELECT user_id, xp FROM {board_table(lifetime)} WHERE guild_id = ?", (guild_id,)))
+
+def export(directory, ndjson, compress, limit):
+    writer = ExportWriter(str(directory), "lifetime_xp_export", ndjson, compress, UPLOAD_MARGIN + limit)
+    async def run():
+        try:
+            return await ExportXP(None)._export_data(True, GUILD, writer)
+        finally:
+            writer.close()
+    return asyncio.run(run()), writer.paths
+
+def load(paths, monkeypatch):
+    async def download(self, url):
+        with open(url, "rb") as f:
+            while chunk := f.read(4096):
+                yield chunk
+    monkeypatch.setattr(import_cog.ImportXP, "_download", download)
+    sources = [(path, os.path.basename(path)) for path in paths]
+    return asyncio.run(import_cog.ImportXP(None)._import_data(sources, True, GUILD))
+
+@pytest.mark.parametrize("ndjson", [False, True])
+@pytest.mark.parametrize("compress", [False, True])
+def test_split_export_round_trip(xp_db, xp_curve, tmp_path, monkeypatch, ndjson, compress):
+    users = GZIP_USERS if compress else USERS
+    fill(xp_db, users=users)
+    fill(xp_db, guild_id=GUILD + 1, users=10)
+    expected = board(xp_db)
+    count, paths = export(tmp_path, ndjson, compress, limit=8 * 1024)
+    assert count == users
+    assert len(paths) > 2
+    assert all("_part" in os.path.basename(path) for path in paths)
+
+    xp_db.execute(f"UPDATE {board_table(True)} SET xp = 0")
+    assert load(paths, monkeypatch) == users
+    assert board(xp_db) == expected
+    assert board(xp_db, guild_id=GUILD + 1) == {str(100000 + n): 0 for n in range(10)}  # Other guilds untouched
+
+def test_bad_part_leaves_board_alone(xp_db, xp_curve, tmp_path, monkeypatch):
+    fill(xp_db)
+    expected = board(xp_db)
+    _, paths = export(tmp_path, False, False, limit=8 * 1024)
+    with open(paths[-1], "ab") as f:
+        f.write(b"garbage")
+    with pytest.raises(ValueError, match=os.path.basename(paths[-1])):
+        load(paths, monkeypatch)
+    assert board(xp_db) == expected
+    assert not xp_db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'xp_import'")
+
+def test_unsplit_export_has_no_part_number(xp_db, tmp_path):
+    fill(xp_db)
+    _, paths = export(tmp_path, False, True, limit=10 * 1024 * 1024)
+    assert [os.path.basename(path) for path in paths] == ["lifetime_xp_export.json.gz"]
+    with gzip.open(paths[0]) as f:
+        assert f.read().startswith(b'{"users": {')
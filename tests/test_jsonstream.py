@@ -0,0 +1,78 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from xp.jsonstream import iter_users, iter_ndjson_users, gunzip
+
+DOCUMENT = {
+    "meta": {"exported": "2024-01-01", "tags": ["a", "}"]},
+    "users": {
+        "111": {"xp": 12.5, "name": "Zoë"},
+        "222": {"xp": 40000, "nested": {"k": [1, 2, {"x": "}"}]}},
+        "333": {"xp": -7e2},
+    },
+    "version": 3,
+}
+EXPECTED = list(DOCUMENT["users"].items())
+
+def collect(agen):
+    async def run():
+        return [item async for item in agen]
+    return asyncio.run(run())
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def users(text: str, size: int = 64):
+    return collect(iter_users(chunked(text.encode(), size)))
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10 ** 6])
+def test_any_chunk_split(size):
+    assert users(json.dumps(DOCUMENT, ensure_ascii=False), size) == EXPECTED
+    assert users(json.dumps(DOCUMENT, indent=2), size) == EXPECTED
+
+def test_number_split_across_chunks():
+    async def chunks():
+        for chunk in (b'{"users": {"1": 12', b'.5, "2": 3', b"", b"}}"):
+            yield chunk
+    assert collect(iter_users(chunks())) == [("1", 12.5), ("2", 3)]
+
+def test_empty_users():
+    assert users('{"users": {}}') == []
+    assert users('{"other": 1}') == []
+
+@pytest.mark.parametrize("text", [
+    '{"users": {"1" {"xp": 1}}}',
+    '{"users": {"1": {"xp": 1}}',
+    '{"users": {}} {}',
+    "",
+])
+def test_malformed_rejected(text):
+    with pytest.raises(ValueError):
+        users(text)
+
+def test_iter_ndjson_users():
+    data = b'{"user_id": 1, "xp": 5}\n\n{"user_id": "2", "xp": 6}'
+    assert collect(iter_ndjson_users(chunked(data, 4))) == [("1", {"xp": 5}), ("2", {"xp": 6})]
+
+def test_iter_ndjson_reports_line():
+    data = b'{"user_id": 1}\n{"xp": 6}\n'
+    with pytest.raises(ValueError, match="line 2"):
+        collect(iter_ndjson_users(chunked(data, 4)))
+
+def test_gunzip():
+    data = json.dumps(DOCUMENT).encode()
+    assert b"".join(collect(gunzip(chunked(gzip.compress(data), 5)))) == data
+
+def test_gunzip_truncated():
+    with pytest.raises(ValueError):
+        collect(gunzip(chunked(gzip.compress(b"x" * 1000)[:-4], 5)))
+
+def test_users_through_gunzip():
+    data = gzip.compress(json.dumps(DOCUMENT).encode())
+    assert collect(iter_users(gunzip(chunked(data, 5)))) == EXPECTED
+    with pytest.raises(ValueError, match="gzip"):
+        collect(iter_users(gunzip(chunked(data[:-4], 5))))
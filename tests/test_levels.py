@@ -0,0 +1,60 @@
+from xp.levels import LevelCurve, curve_xp, INITIAL_LEVELS, MAX_LEVEL
+
+def test_thresholds_follow_curve(xp_curve):
+    levels = LevelCurve()
+    assert levels.xp_for_level(0) == 0
+    assert levels.xp_for_level(20) == curve_xp(20, xp_curve) == 300
+    assert levels.xp_for_level(30) == 700
+    assert len(levels.thresholds) == INITIAL_LEVELS + 1
+
+def test_level_for_xp_at_boundaries(xp_curve):
+    levels = LevelCurve()
+    for level in (50, 100, 400):
+        needed = levels.xp_for_level(level)
+        assert levels.xp_for_level(level - 1) < needed
+        assert levels.level_for_xp(needed) == level
+        assert levels.level_for_xp(needed - 1) == level - 1
+
+def test_tied_thresholds_give_highest_level(xp_curve):
+    levels = LevelCurve()
+    assert levels.xp_for_level(24) == levels.xp_for_level(25) == 400  # Rounded down to the hundred
+    assert levels.level_for_xp(400) == 25
+
+def test_level_for_xp_floors_at_zero(xp_curve):
+    levels = LevelCurve()
+    assert levels.level_for_xp(-500) == 0
+
+def test_table_grows_on_demand(xp_curve):
+    levels = LevelCurve()
+    needed = levels.xp_for_level(2000)
+    assert needed == curve_xp(2000, xp_curve)
+    assert levels.level_for_xp(needed) == 2000
+    assert levels.level_for_xp(levels.xp_for_level(5000) + 1) == 5000
+
+def test_growth_stops_at_max_level(xp_curve):
+    levels = LevelCurve()
+    assert levels.level_for_xp(10 ** 30) == MAX_LEVEL
+    assert levels.xp_for_level(MAX_LEVEL * 2) == levels.xp_for_level(MAX_LEVEL)
+
+def test_thresholds_never_decrease(xp_curve):
+    xp_curve.update(base=0, square=-50, linear=10000)  # Peaks, then falls
+    levels = LevelCurve()
+    levels.xp_for_level(0)
+    thresholds = levels.thresholds
+    assert all(a <= b for a, b in zip(thresholds, thresholds[1:]))
+    assert levels.xp_for_level(300) == levels.xp_for_level(100)
+
+def test_rebuilds_when_curve_changes(xp_curve, monkeypatch):
+    from xp.config import config
+    levels = LevelCurve()
+    before = levels.xp_for_level(100)
+    monkeypatch.setattr(config, "_curve", dict(xp_curve, divisor=50))
+    assert levels.xp_for_level(100) == curve_xp(100, config.curve) > before
+
+def test_progress(xp_curve):
+    levels = LevelCurve()
+    start, end = levels.xp_for_level(40), levels.xp_for_level(41)
+    assert levels.progress(start, 40) == 0.0
+    assert levels.progress((start + end) // 2, 40) == (((start + end) // 2) - start) / (end - start)
+    assert levels.progress(end + 1000, 40) == 1.0
+    assert levels.progress(start - 1000, 40) == 0.0
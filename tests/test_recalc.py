@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+from xp import recalc
+from xp.database import TABLE_TEMPLATE
+from xp.levels import level_curve
+
+@pytest.fixture(params=["numpy", "bisect"])
+def backend(request, monkeypatch):
+    if request.param == "bisect":
+        monkeypatch.setattr(recalc, "np", None)
+    elif recalc.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+@pytest.fixture
+def conn(xp_curve):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(TABLE_TEMPLATE.format(table="xp_lifetime"))
+    yield conn
+    conn.close()
+
+def levels(conn, guild_id):
+    return dict(conn.execute("SELECT user_id, level FROM xp_lifetime WHERE guild_id = ?", (guild_id,)))
+
+def test_compute_levels_matches_level_for_xp(backend, xp_curve):
+    xps = [0, 1, 399, 400, 5000, 123456, 10 ** 9]
+    assert [int(level) for level in recalc.compute_levels(xps)] == [level_curve.level_for_xp(xp) for xp in xps]
+
+def test_compute_levels_empty(backend):
+    assert len(recalc.compute_levels([])) == 0
+
+def test_recalc_writes_only_changed_rows(backend, conn):
+    right = level_curve.level_for_xp(5000)
+    conn.executemany(
+        "INSERT INTO xp_lifetime (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)",
+        [(1, "a", 5000, right), (1, "b", 5000, 0), (1, "c", None, 3), (2, "d", 5000, 0)]
+    )
+    assert recalc.recalc_levels(conn, "xp_lifetime", 1) == (2, 3)
+    assert levels(conn, 1) == {"a": right, "b": right, "c": level_curve.level_for_xp(0)}  # NULL xp counts as 0
+    assert levels(conn, 2) == {"d": 0}  # Other guilds are left alone
+
+def test_recalc_one_user(backend, conn):
+    conn.executemany(
+        "INSERT INTO xp_lifetime (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)",
+        [(1, "a", 5000, 0), (1, "b", 5000, 0)]
+    )
+    assert recalc.recalc_levels(conn, "xp_lifetime", 1, "b") == (1, 1)
+    assert levels(conn, 1) == {"a": 0, "b": level_curve.level_for_xp(5000)}
+
+def test_recalc_empty_guild(backend, conn):
+    assert recalc.recalc_levels(conn, "xp_lifetime", 1) == (0, 0)
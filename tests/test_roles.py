@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from xp import roles
+from xp.roles import RoleRewardScheduler
+from xp.sync import XPSync
+
+def member(member_id, guild_id=1):
+    guild = SimpleNamespace(id=guild_id, get_member=lambda _: None)
+    return SimpleNamespace(id=member_id, guild=guild)
+
+@pytest.fixture
+def granted(monkeypatch):
+    """Members whose roles were applied, with the level; each grant yields to the loop first."""
+    calls = []
+    async def apply_rewards(member, level):
+        await asyncio.sleep(0)
+        calls.append((member.id, level))
+        return [f"level {level}"]
+    monkeypatch.setattr(roles, "apply_rewards", apply_rewards)
+    return calls
+
+def test_level_ups_coalesce(granted):
+    async def run():
+        scheduler = RoleRewardScheduler()
+        first = scheduler.schedule(member(1), 5)
+        second = scheduler.schedule(member(1), 8)
+        assert first is second
+        assert await first == ["level 8"]
+        scheduler.stop()
+    asyncio.run(run())
+    assert granted == [(1, 8)]
+
+def test_schedule_after_stop(granted):
+    async def run():
+        scheduler = RoleRewardScheduler()
+        stale = scheduler.schedule(member(1), 5)
+        scheduler.stop()
+        assert stale.cancelled()
+        assert scheduler.pending == {} and scheduler.queue.empty()
+        fresh = scheduler.schedule(member(1), 6)
+        assert fresh is not stale
+        assert await fresh == ["level 6"]
+        scheduler.stop()
+    asyncio.run(run())
+    assert granted == [(1, 6)]
+
+def test_apply_all_counts_members_cut_off_by_stop(granted, monkeypatch):
+    scheduler = RoleRewardScheduler()
+    monkeypatch.setattr("xp.sync.role_scheduler", scheduler)
+    progress = {"done": 0, "updated": 0, "roles": 0, "failed": 0}
+
+    async def run():
+        job = asyncio.create_task(XPSync(None)._apply_all([(member(n), 3) for n in range(10)], progress))
+        while not granted:
+            await asyncio.sleep(0)
+        scheduler.stop()  # As an XP cog reload does
+        await asyncio.wait_for(job, 1)
+    asyncio.run(run())
+    assert progress["done"] == 10
+    assert progress["updated"] == len(granted) >= 1
+    assert progress["failed"] == 10 - len(granted)
+
+def test_sync_user_cut_off_by_stop(xp_db, monkeypatch):
+    async def never(member, level):
+        await asyncio.Event().wait()
+    monkeypatch.setattr(roles, "apply_rewards", never)
+    scheduler = RoleRewardScheduler()
+    monkeypatch.setattr("xp.sync.role_scheduler", scheduler)
+    xp_db.execute("INSERT INTO xp_lifetime (guild_id, user_id, xp, level) VALUES (1, '7', 500, 4)")
+
+    async def run():
+        sync = asyncio.create_task(XPSync(None).sync_roles_for_user(member(7)))
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return await asyncio.wait_for(sync, 1)
+    assert asyncio.run(run()) == (4, None)
+
+def test_sync_user_task_cancel_propagates(xp_db, monkeypatch):
+    async def never(member, level):
+        await asyncio.Event().wait()
+    monkeypatch.setattr(roles, "apply_rewards", never)
+    scheduler = RoleRewardScheduler()
+    monkeypatch.setattr("xp.sync.role_scheduler", scheduler)
+    xp_db.execute("INSERT INTO xp_lifetime (guild_id, user_id, xp, level) VALUES (1, '7', 500, 4)")
+
+    async def run():
+        sync = asyncio.create_task(XPSync(None).sync_roles_for_user(member(7)))
+        await asyncio.sleep(0.05)
+        sync.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await sync
+        scheduler.stop()
+    asyncio.run(run())
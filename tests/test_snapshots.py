@@ -0,0 +1,186 @@
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from xp.database import SCHEMA, LEGACY_GUILD_ID
+from xp.snapshots import (
+    write_diff, build_restore, apply_retention, create_snapshot, validate_backup, parse_backup_name,
+    TIMESTAMP_FORMAT, DIFF_EXT,
+)
+
+T0 = datetime(2024, 3, 1, 12, 0, 0)
+GUILD = 42
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    path = tmp_path / "backups"
+    path.mkdir()
+    return str(path)
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "xp.db"))
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+def upsert(conn, user_id, xp, guild_id=GUILD):
+    conn.execute(
+        "INSERT OR REPLACE INTO xp_lifetime (guild_id, user_id, xp, level, last_message) VALUES (?, ?, ?, 0, 0)",
+        (guild_id, user_id, xp)
+    )
+    conn.commit()
+
+def board(path, table="xp_lifetime"):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute(f"SELECT user_id, xp FROM {table} WHERE guild_id = ?", (GUILD,)))
+    finally:
+        conn.close()
+
+def diff(conn, backup_dir, now):
+    with conn:
+        return write_diff(conn, backup_dir, True, now)
+
+def stamp(name, when, ext=".db.gz"):
+    return f"{name}_{when.strftime(TIMESTAMP_FORMAT)}{ext}"
+
+def test_write_diff(conn, backup_dir):
+    upsert(conn, "a", 10)
+    upsert(conn, "b", 20)
+    upsert(conn, "a", 15)
+    conn.execute("DELETE FROM xp_lifetime WHERE user_id = 'b'")
+    conn.commit()
+
+    path, rows = diff(conn, backup_dir, T0)
+    assert rows == 2
+    assert os.path.basename(path) == stamp("lifetime", T0, DIFF_EXT)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        entries = sorted((json.loads(line) for line in f), key=lambda entry: entry["user_id"])
+    assert entries == [
+        {"guild_id": GUILD, "user_id": "a", "xp": 15, "level": 0, "last_message": 0},
+        {"guild_id": GUILD, "user_id": "b", "deleted": True},
+    ]
+    assert conn.execute("SELECT COUNT(*) FROM xp_changes WHERE board = 'lifetime'").fetchone()[0] == 0
+
+def test_write_diff_without_changes(conn, backup_dir):
+    assert diff(conn, backup_dir, T0) == (None, 0)
+    assert os.listdir(backup_dir) == []
+
+def test_diff_chain_until(conn, tmp_path, backup_dir):
+    upsert(conn, "a", 10)
+    upsert(conn, "b", 20)
+    conn.execute("DELETE FROM xp_changes")
+    conn.commit()
+    base = os.path.basename(create_snapshot(str(tmp_path / "xp.db"), backup_dir, "xp", T0))
+
+    upsert(conn, "a", 11)
+    diff(conn, backup_dir, T0 + timedelta(hours=1))
+    upsert(conn, "c", 30)
+    conn.execute("DELETE FROM xp_lifetime WHERE user_id = 'b'")
+    conn.commit()
+    diff(conn, backup_dir, T0 + timedelta(hours=2))
+
+    dest = str(tmp_path / "restore.db")
+    assert build_restore(backup_dir, base, dest, True) == 0
+    assert board(dest) == {"a": 10, "b": 20}
+    assert build_restore(backup_dir, base, dest, True, until=T0 + timedelta(hours=1, minutes=30)) == 1
+    assert board(dest) == {"a": 11, "b": 20}
+    assert build_restore(backup_dir, base, dest, True, until=T0 + timedelta(hours=2)) == 2
+    assert board(dest) == {"a": 11, "c": 30}
+    assert build_restore(backup_dir, base, dest, True, until=T0 - timedelta(hours=1)) == 0
+
+def test_diffs_before_base_are_skipped(conn, tmp_path, backup_dir):
+    upsert(conn, "a", 10)
+    diff(conn, backup_dir, T0 - timedelta(hours=1))
+    upsert(conn, "a", 20)
+    conn.execute("DELETE FROM xp_changes")
+    conn.commit()
+    base = os.path.basename(create_snapshot(str(tmp_path / "xp.db"), backup_dir, "xp", T0))
+
+    dest = str(tmp_path / "restore.db")
+    assert build_restore(backup_dir, base, dest, True, until=T0 + timedelta(days=1)) == 0
+    assert board(dest) == {"a": 20}
+
+def test_restore_until_needs_full_backup(conn, tmp_path, backup_dir):
+    upsert(conn, "a", 10)
+    base = os.path.basename(create_snapshot(str(tmp_path / "xp.db"), backup_dir, "annual", T0))
+    with pytest.raises(ValueError):
+        build_restore(backup_dir, base, str(tmp_path / "restore.db"), True, until=T0 + timedelta(hours=1))
+
+def test_restore_keys_legacy_backup(tmp_path, backup_dir):
+    base = stamp("lifetime", T0, ".db")
+    old = sqlite3.connect(os.path.join(backup_dir, base))
+    old.execute("CREATE TABLE xp (user_id TEXT PRIMARY KEY, xp INTEGER, level INTEGER, last_message INTEGER)")
+    old.execute("INSERT INTO xp VALUES ('a', 10, 0, 0)")
+    old.commit()
+    old.close()
+    with gzip.open(os.path.join(backup_dir, stamp("lifetime", T0 + timedelta(hours=1), DIFF_EXT)), "wt") as f:
+        f.write(json.dumps({"user_id": "b", "xp": 5, "level": 0, "last_message": 0}) + "\n")
+
+    dest = str(tmp_path / "restore.db")
+    assert build_restore(backup_dir, base, dest, True, until=T0 + timedelta(days=1)) == 1
+    conn = sqlite3.connect(dest)
+    rows = sorted(conn.execute("SELECT guild_id, user_id, xp FROM xp"))
+    conn.close()
+    assert rows == [(LEGACY_GUILD_ID, "a", 10), (LEGACY_GUILD_ID, "b", 5)]
+
+def test_validate_backup(conn, tmp_path):
+    upsert(conn, "a", 10)
+    path = str(tmp_path / "xp.db")
+    assert validate_backup(path, True, GUILD) == "xp_lifetime"
+    with pytest.raises(ValueError, match="this server"):
+        validate_backup(path, True, GUILD + 1)
+    with pytest.raises(ValueError, match="annual"):
+        validate_backup(path, False, GUILD)
+
+def test_parse_backup_name():
+    assert parse_backup_name(stamp("xp", T0)) == ("xp", T0, False)
+    assert parse_backup_name(stamp("annual", T0, DIFF_EXT)) == ("annual", T0, True)
+    assert parse_backup_name("last_backup.txt") is None
+    assert parse_backup_name("xp_yesterday.db") is None
+
+def touch(backup_dir, filename):
+    open(os.path.join(backup_dir, filename), "w").close()
+    return filename
+
+def test_retention_keeps_newest_per_day_and_week(backup_dir):
+    newest = datetime(2024, 3, 31, 12, 0, 0)  # A Sunday
+    days = [touch(backup_dir, stamp("xp", newest - timedelta(days=n))) for n in range(60)]
+    earlier_today = touch(backup_dir, stamp("xp", newest - timedelta(hours=3)))
+    other = touch(backup_dir, stamp("lifetime", newest - timedelta(days=59)))
+    touch(backup_dir, "last_backup.txt")
+
+    removed = apply_retention(backup_dir, "xp", keep_daily=7, keep_weekly=8)
+
+    # The newest of the last 7 days, then the Sunday closing each earlier week
+    kept = days[:7] + [days[n] for n in range(7, 60) if n % 7 == 0][:7]
+    assert sorted(os.listdir(backup_dir)) == sorted(kept + [other, "last_backup.txt"])
+    assert earlier_today in removed
+    assert len(removed) == 61 - len(kept)
+
+def test_retention_keeps_diffs_back_to_oldest_daily(backup_dir):
+    newest = datetime(2024, 3, 31, 12, 0, 0)
+    for n in range(10):
+        touch(backup_dir, stamp("xp", newest - timedelta(days=n)))
+    oldest_daily = newest - timedelta(days=2)
+    before = touch(backup_dir, stamp("lifetime", oldest_daily - timedelta(seconds=1), DIFF_EXT))
+    at = touch(backup_dir, stamp("annual", oldest_daily, DIFF_EXT))
+    after = touch(backup_dir, stamp("lifetime", newest + timedelta(hours=1), DIFF_EXT))
+    foreign = touch(backup_dir, stamp("xp", oldest_daily - timedelta(days=1), DIFF_EXT))
+
+    removed = apply_retention(backup_dir, "xp", ("lifetime", "annual"), keep_daily=3, keep_weekly=0)
+
+    remaining = set(os.listdir(backup_dir))
+    assert before in removed
+    assert {at, after, foreign} <= remaining  # xp diffs aren't managed when diff_names is given
+    assert len(removed) == 8
+
+def test_retention_drops_diffs_without_a_base(backup_dir):
+    diff_name = touch(backup_dir, stamp("xp", T0, DIFF_EXT))
+    assert apply_retention(backup_dir, "xp") == [diff_name]  # Nothing to replay it onto
+    assert os.listdir(backup_dir) == []
@@ -0,0 +1,34 @@
+import random
+
+from sparkle.tiers import SparkleRoller, SparkleTier, SPARKLE_TIERS, SCORE_SQL
+
+def naive_roll(tiers, message_id):
+    for tier in sorted(tiers, key=lambda tier: tier.modulus, reverse=True):
+        if message_id % tier.modulus == 0:
+            return tier
+    return None
+
+def test_rarest_tier_wins():
+    roller = SparkleRoller()
+    assert roller.roll(100000).name == "epic"
+    assert roller.roll(30000).name == "rare"
+    assert roller.roll(7000).name == "regular"
+    assert roller.roll(0).name == "epic"
+    assert roller.roll(999) is None
+    assert roller.roll(1234567) is None
+
+def test_gate_is_gcd():
+    assert SparkleRoller().gate == 1000
+    tiers = [SparkleTier(6, "a", "", "", 1), SparkleTier(10, "b", "", "", 1)]
+    assert SparkleRoller(tiers).gate == 2
+
+def test_matches_naive_roll():
+    rng = random.Random(1234)
+    ids = [rng.randrange(1 << 63) for _ in range(5000)] + [rng.randrange(1 << 40) * 1000 for _ in range(5000)]
+    odd = [SparkleTier(6, "a", "", "", 1), SparkleTier(10, "b", "", "", 1), SparkleTier(15, "c", "", "", 1)]
+    for tiers in (SPARKLE_TIERS, odd):
+        roller = SparkleRoller(tiers)
+        assert [roller.roll(i) for i in ids] == [naive_roll(tiers, i) for i in ids]
+
+def test_score_sql():
+    assert SCORE_SQL == "epic * 100 + rare * 10 + regular * 1"
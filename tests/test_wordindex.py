@@ -0,0 +1,87 @@
+import random
+from array import array
+
+import pytest
+
+from wordbomb import wordindex
+from wordbomb.wordindex import WordIndex, MIN_MATCHES
+
+WORDS = ["ant", "pant", "plant", "planter", "banana", "cat", "a", "xy"]
+
+def test_matches_indexed_substrings():
+    index = WordIndex(WORDS)
+    for substring in ("ant", "lant", "plant", "ana", "nan", "cat"):
+        assert index.matches(substring) == [word for word in WORDS if substring in word]
+        assert index.count(substring) == len(index.matches(substring))
+
+def test_word_listed_once_per_substring(monkeypatch):
+    monkeypatch.setattr(wordindex, "MIN_MATCHES", 2)
+    index = WordIndex(["banana", "ana", "bandana"])
+    assert index.matches("ana") == ["banana", "ana", "bandana"]
+    assert isinstance(index.postings["ana"], array)
+    assert index.postings["ana"].tolist() == [0, 1, 2]
+
+def test_only_playable_substrings_indexed(monkeypatch):
+    monkeypatch.setattr(wordindex, "MIN_MATCHES", 2)
+    index = WordIndex(["banana", "bandit", "cat"])
+    assert index.playable == sorted(index.postings) == ["ban"]
+    # "ana" is twice in banana, but that is still one word
+    assert "ana" not in index.postings
+    assert index.count("ana") == 1
+    assert index.matches("cat") == ["cat"]
+
+def test_unindexed_lengths_scan():
+    index = WordIndex(WORDS)
+    assert index.matches("an") == [word for word in WORDS if "an" in word]
+    assert index.matches("lante") == ["planter"]
+    assert index.matches("planter") == ["planter"]
+    assert index.count("a") == 7
+
+def test_missing_substring():
+    index = WordIndex(WORDS)
+    assert index.matches("zzz") == []
+    assert index.count("zzz") == 0
+    assert index.count("zzzzzz") == 0
+
+def test_contains():
+    index = WordIndex(WORDS)
+    assert "plant" in index
+    assert "plan" not in index
+
+def test_playable_and_pick(monkeypatch):
+    words = [f"{prefix}ing" for prefix in ("r", "s", "k", "w", "th", "br")]
+    monkeypatch.setattr(wordindex, "MIN_MATCHES", 5)
+    index = WordIndex(words)
+    assert index.playable == ["ing"]
+    random.seed(0)
+    for _ in range(20):
+        word, substring = index.pick()
+        assert substring == "ing" and word in words
+
+def test_pick_without_playable():
+    assert MIN_MATCHES > len(WORDS)
+    assert WordIndex(WORDS).pick() is None
+
+def test_from_file(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("Ant\n\n  Pant \nplant\n", encoding="utf-8")
+    index = WordIndex.from_file(str(path))
+    assert index.words == ["ant", "pant", "plant"]
+    assert index.count("ant") == 3
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_brute_force(seed, monkeypatch):
+    monkeypatch.setattr(wordindex, "MIN_MATCHES", 20)
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 8))) for _ in range(300)]
+    index = WordIndex(words)
+    assert index.playable == sorted(
+        substring for substring in {word[i:i + n] for word in words for n in (3, 4, 5) for i in range(len(word) - n + 1)}
+        if sum(substring in word for word in words) >= 20
+    )
+    for length in range(1, 7):
+        for _ in range(20):
+            substring = "".join(rng.choice("abc") for _ in range(length))
+            expected = [word for word in words if substring in word]
+            assert index.matches(substring) == expected
+            assert index.count(substring) == len(expected)
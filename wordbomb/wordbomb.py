@@ -3,12 +3,45 @@ from discord.ext import commands
 import random
 import sqlite3
 import os
-from typing import Optional
+import asyncio
+from typing import NamedTuple, Optional
 from dotenv import load_dotenv
+from core.database import get_database
+from .wordindex import WordIndex, MIN_MATCHES
 
 load_dotenv()
 ADMIN_ROLE_ID = int(os.getenv("ADMIN_ROLE_ID"))
 
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS guilds (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        channel_id INTEGER NOT NULL,
+        last_word TEXT NOT NULL DEFAULT '',
+        last_substring TEXT NOT NULL DEFAULT ''
+    );
+
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        guild_id INTEGER NOT NULL,
+        score INTEGER NOT NULL DEFAULT 0,
+        UNIQUE(user_id, guild_id),
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (guild_id) REFERENCES guilds(id)
+    );
+"""
+
+class ActiveGame(NamedTuple):
+    channel_id: int
+    substring: str
+    word: str
+
 class WordBomb(commands.Cog):
     def __init__(self, client):
         self.client = client
@@ -16,129 +49,87 @@ class WordBomb(commands.Cog):
         self.db_path = os.path.join(self.base_dir, 'wordbomb.db')
         self.words_path = os.path.join(self.base_dir, 'words.txt')
         
-        # Initialize database
-        self.db = sqlite3.connect(self.db_path)
-        self.db.row_factory = sqlite3.Row
-        self.c = self.db.cursor()
-        self.initialize_database()
-        
-        # Load word list
-        with open(self.words_path, 'r', encoding='utf-8') as f:
-            self.words = [word.strip().lower() for word in f.readlines() if word.strip()]
-
-    def initialize_database(self):
-        """Initialize database schema"""
-        self.c.executescript("""
-        CREATE TABLE IF NOT EXISTS guilds (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            channel_id INTEGER NOT NULL,
-            last_word TEXT NOT NULL DEFAULT '',
-            last_substring TEXT NOT NULL DEFAULT ''
-        );
-        
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL
-        );
-        
-        CREATE TABLE IF NOT EXISTS scores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            guild_id INTEGER NOT NULL,
-            score INTEGER NOT NULL DEFAULT 0,
-            UNIQUE(user_id, guild_id),
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (guild_id) REFERENCES guilds(id)
-        );
-        """)
-        self.db.commit()
+        # Shared connection; the schema is created on first use
+        self.db = get_database(self.db_path, SCHEMA, row_factory=sqlite3.Row)
+        # guild_id -> ActiveGame, mirroring the guilds table; loaded in cog_load
+        self.games: dict[int, ActiveGame] = {}
+        # Word list with its substring index; built in cog_load
+        self.index: WordIndex | None = None
+
+    async def cog_load(self):
+        """Index the word list and load running games so messages can be checked without a query"""
+        self.index = await asyncio.to_thread(WordIndex.from_file, self.words_path)
+        rows = await self.db.afetchall("SELECT id, channel_id, last_substring, last_word FROM guilds")
+        self.games = {row['id']: ActiveGame(row['channel_id'], row['last_substring'], row['last_word']) for row in rows}
 
     async def get_word(self):
         """Generate word and substring with minimum 100 matches"""
-        max_attempts = 1000
-        attempts = 0
-        
-        while attempts < max_attempts:
-            word = random.choice(self.words)
-            word_length = len(word)
-            substring_length = min(random.randint(3, 5), word_length)
-            start = random.randint(0, word_length - substring_length)
-            substring = word[start:start+substring_length]
-            
-            matching_words = await self.filter_words(substring)
-            if len(matching_words) >= 100:
-                return word, substring
-            
-            attempts += 1
-        
+        # Sampled straight from the substrings the index knows have enough matches
+        picked = self.index.pick()
+        if picked:
+            return picked
+
         common_substrings = ['ing', 'ion', 'er', 'ed', 'es', 'tion', 'ter', 'ent', 'ant']
         for substring in common_substrings:
             matching_words = await self.filter_words(substring)
-            if len(matching_words) >= 100:
+            if len(matching_words) >= MIN_MATCHES:
                 # Pick a random word containing this substring
                 word = random.choice(matching_words)
                 return word, substring
         
         # Ultimate fallback (should never reach here)
-        return word, substring
+        word = random.choice(self.index.words)
+        return word, word[:3]
 
     async def filter_words(self, substring):
         """Find all words containing the substring"""
-        return [word for word in self.words if substring in word]
+        return self.index.matches(substring)
 
-    async def check_answer(self, guild_id, answer):
-        """Validate a player's answer"""
+    def check_answer(self, guild_id, answer):
+        """Validate a player's answer against the guild's running game"""
         answer = answer.strip().lower()
-        self.c.execute("""
-            SELECT last_substring, last_word 
-            FROM guilds 
-            WHERE id=?
-        """, (guild_id,))
-        result = self.c.fetchone()
-        if not result:
+        game = self.games.get(guild_id)
+        if game is None:
             return False, None
-        return result['last_substring'] in answer and answer in self.words, result['last_substring']
+        return game.substring in answer and answer in self.index, game.substring
 
     async def update_score(self, user_id, guild_id):
         """Update score with proper error handling"""
-        try:
+        def db_task(conn):
             # Update user info
-            self.c.execute("""
+            conn.execute("""
                 INSERT INTO users (id, name)
                 VALUES (?, ?)
                 ON CONFLICT(id) DO UPDATE SET name=excluded.name
             """, (user_id, str(user_id)))
             
             # Update score
-            self.c.execute("""
+            conn.execute("""
                 INSERT INTO scores (user_id, guild_id, score)
                 VALUES (?, ?, 1)
                 ON CONFLICT(user_id, guild_id) 
                 DO UPDATE SET score = score + 1
             """, (user_id, guild_id))
-            self.db.commit()
+
+        try:
+            # Both statements commit together or roll back together
+            await self.db.run(db_task)
         except sqlite3.Error as e:
             print(f"Database error in update_score: {e}")
-            self.db.rollback()
             raise
     
     async def get_user_score(self, user_id, guild_id):
         """Get current score for a user"""
-        self.c.execute("""
+        result = await self.db.afetchone("""
             SELECT score FROM scores
             WHERE user_id=? AND guild_id=?
         """, (user_id, guild_id))
-        result = self.c.fetchone()
         return result['score'] if result else 0
 
-    async def check_for_game(self, guild_id, channel_id):
+    def check_for_game(self, guild_id, channel_id):
         """Check if a game exists in the channel"""
-        self.c.execute("""
-            SELECT 1 FROM guilds 
-            WHERE id=? AND channel_id=?
-        """, (guild_id, channel_id))
-        return bool(self.c.fetchone())
+        game = self.games.get(guild_id)
+        return game is not None and game.channel_id == channel_id
 
     @commands.hybrid_command()
     async def start(self, ctx):
@@ -148,13 +139,13 @@ class WordBomb(commands.Cog):
             await ctx.send("❌ You do not have permission to start the game.", ephemeral=True)
             return
 
-        if await self.check_for_game(ctx.guild.id, ctx.channel.id):
+        if self.check_for_game(ctx.guild.id, ctx.channel.id):
             await ctx.send("🚨 A game is already running in this channel!")
             return
 
         word, substring = await self.get_word()
         try:
-            self.c.execute("""
+            await self.db.aexecute("""
                 INSERT INTO guilds (id, name, channel_id, last_word, last_substring)
                 VALUES (?, ?, ?, ?, ?)
                 ON CONFLICT(id) DO UPDATE SET
@@ -163,7 +154,7 @@ class WordBomb(commands.Cog):
                     last_word=excluded.last_word,
                     last_substring=excluded.last_substring
             """, (ctx.guild.id, ctx.guild.name, ctx.channel.id, word, substring))
-            self.db.commit()
+            self.games[ctx.guild.id] = ActiveGame(ctx.channel.id, substring, word)
 
             await ctx.send(
                 f"# 💣 WORD BOMB STARTED\n"
@@ -183,21 +174,20 @@ class WordBomb(commands.Cog):
             await ctx.send("❌ You do not have permission to end the game.", ephemeral=True)
             return
 
-        self.c.execute("DELETE FROM guilds WHERE id=?", (ctx.guild.id,))
-        self.db.commit()
+        await self.db.aexecute("DELETE FROM guilds WHERE id=?", (ctx.guild.id,))
+        self.games.pop(ctx.guild.id, None)
         await ctx.send("✅ Game ended!")
 
     @commands.hybrid_command()
     async def wordbomb_leaderboard(self, ctx):
         """Show top 10 players in this server"""
-        self.c.execute("""
+        top_players = await self.db.afetchall("""
             SELECT user_id, score 
             FROM scores 
             WHERE guild_id=? 
             ORDER BY score DESC 
             LIMIT 10
         """, (ctx.guild.id,))
-        top_players = self.c.fetchall()
         
         embed = discord.Embed(
             title="🏆 LEADERBOARD",
@@ -225,27 +215,30 @@ class WordBomb(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if (message.author.bot or 
-            not message.guild or 
-            not await self.check_for_game(message.guild.id, message.channel.id)):
+        if message.author.bot or not message.guild:
+            return
+        # Most messages are in channels without a game and stop at this lookup
+        game = self.games.get(message.guild.id)
+        if game is None or game.channel_id != message.channel.id:
             return
 
         try:
-            valid, last_substring = await self.check_answer(message.guild.id, message.content)
+            valid, last_substring = self.check_answer(message.guild.id, message.content)
             if not valid:
                 return
 
             new_word, new_substring = await self.get_word()
-            num_words = len(await self.filter_words(new_substring))
-            await self.update_score(message.author.id, message.guild.id)
-            current_score = await self.get_user_score(message.author.id, message.guild.id)
-
-            self.c.execute("""
+            num_words = self.index.count(new_substring)
+            # Move the game on before the database write, so a second answer to the same substring isn't scored too
+            self.games[message.guild.id] = ActiveGame(message.channel.id, new_substring, new_word)
+            await self.db.aexecute("""
                 UPDATE guilds 
                 SET last_word=?, last_substring=? 
                 WHERE id=? AND channel_id=?
             """, (new_word, new_substring, message.guild.id, message.channel.id))
-            self.db.commit()
+
+            await self.update_score(message.author.id, message.guild.id)
+            current_score = await self.get_user_score(message.author.id, message.guild.id)
 
             response = (
                 f"# 🎯・NEW SUBSTRING ・🎯\n"
@@ -261,7 +254,6 @@ class WordBomb(commands.Cog):
         except sqlite3.Error as e:
             print(f"Database error in on_message: {e}")
             await message.channel.send("⚠️ Database error - please try again")
-            self.db.rollback()
         except Exception as e:
             print(f"Unexpected error in on_message: {e}")
             await message.channel.send("⚠️ An error occurred")
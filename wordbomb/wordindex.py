@@ -0,0 +1,86 @@
+import random
+from array import array
+from collections import Counter
+
+MIN_LENGTH = 3  # Shortest substring indexed
+MAX_LENGTH = 5  # Longest substring indexed
+MIN_MATCHES = 100  # Words a substring needs to be played
+
+def candidate_substrings(words: list[str]) -> set[str]:
+    """3-5 letter substrings occurring at least MIN_MATCHES times in the words.
+
+    A superset of the playable ones, as a word may hold a substring twice.
+    Counted one length at a time: a substring is only as common as both of
+    its one-letter-shorter ends, so longer ones are only counted when both
+    ends made it at the previous length.
+    """
+    candidates = set()
+    frequent = None
+    for length in range(MIN_LENGTH, MAX_LENGTH + 1):
+        counts = Counter(
+            word[start:start + length]
+            for word in words
+            for start in range(len(word) - length + 1)
+            if frequent is None
+            or (word[start:start + length - 1] in frequent and word[start + 1:start + length] in frequent)
+        )
+        frequent = {substring for substring, count in counts.items() if count >= MIN_MATCHES}
+        candidates |= frequent
+    return candidates
+
+class WordIndex:
+    """The WordBomb dictionary, indexed by the 3-5 letter substrings worth playing.
+
+    Substrings contained in at least MIN_MATCHES words are playable, and only
+    they keep the ids (positions in `words`) of their words, as a compact
+    unsigned int array, so a playable substring and a word for it are picked
+    with two random choices. Anything else is looked up by scanning the list.
+    """
+
+    def __init__(self, words: list[str]):
+        self.words = words
+        self.word_set = frozenset(words)
+        postings = {substring: array("I") for substring in candidate_substrings(words)}
+        for word_id, word in enumerate(words):
+            found = {
+                word[start:start + length]
+                for length in range(MIN_LENGTH, min(MAX_LENGTH, len(word)) + 1)
+                for start in range(len(word) - length + 1)
+            }
+            for substring in found:
+                ids = postings.get(substring)
+                if ids is not None:
+                    ids.append(word_id)
+        self.postings: dict[str, array] = {
+            substring: ids for substring, ids in postings.items() if len(ids) >= MIN_MATCHES
+        }
+        self.playable = sorted(self.postings)
+
+    @classmethod
+    def from_file(cls, path: str) -> "WordIndex":
+        """Load and index a word list with one word per line. Blocking."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls([word.strip().lower() for word in f if word.strip()])
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_set
+
+    def matches(self, substring: str) -> list[str]:
+        """Every word containing the substring"""
+        ids = self.postings.get(substring)
+        if ids is None:
+            return [word for word in self.words if substring in word]  # Not playable, so not indexed
+        return [self.words[word_id] for word_id in ids]
+
+    def count(self, substring: str) -> int:
+        ids = self.postings.get(substring)
+        if ids is None:
+            return sum(substring in word for word in self.words)
+        return len(ids)
+
+    def pick(self) -> tuple[str, str] | None:
+        """A random playable substring and a random word containing it, or None if there are none"""
+        if not self.playable:
+            return None
+        substring = random.choice(self.playable)
+        return self.words[random.choice(self.postings[substring])], substring
@@ -0,0 +1,180 @@
+import threading
+from core.database import run_blocking
+from .database import get_board, board_table
+
+FLUSH_INTERVAL = 30  # Seconds between write-behind flushes
+
+SELECT_SQL = "SELECT xp, level, last_message FROM {table} WHERE guild_id = ? AND user_id = ?"
+
+UPSERT_SQL = """
+    INSERT INTO {table} (guild_id, user_id, xp, level, last_message) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id) DO UPDATE SET
+        xp = excluded.xp,
+        level = excluded.level,
+        last_message = excluded.last_message
+"""
+
+class XPEntry:
+    """Cached XP row for one user in one guild on one board."""
+    __slots__ = ("xp", "level", "last_message", "seen", "generation")
+
+    def __init__(self, xp=0, level=0, last_message=0):
+        self.xp = xp
+        self.level = level
+        self.last_message = last_message
+        self.seen = 0  # Flush count when the entry was last used
+        self.generation = 0  # Board generation the entry was loaded at
+
+_STALE = object()  # _store() result for a row read before the board was rewritten
+
+class XPAccumulator:
+    """In-memory XP state, written behind to both boards in xp.db.
+
+    The message hot path only reads and mutates cached entries. Dirty entries
+    are written to both boards in a single transaction by flush(), which
+    runs in a worker thread every FLUSH_INTERVAL seconds and on shutdown.
+    Clean entries that went unused for a whole flush interval are evicted
+    by the flush, so the cache only holds recently active users.
+    """
+
+    def __init__(self):
+        self.entries = {True: {}, False: {}}  # lifetime -> {(guild_id, user_id): XPEntry}
+        self.dirty = {True: set(), False: set()}
+        self.generation = {True: 0, False: 0}  # Bumped whenever a board is rewritten underneath us
+        self.flushes = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.RLock()
+
+    async def aget(self, guild_id: int, user_id: str, lifetime: bool, create=False) -> XPEntry | None:
+        """Return the cached entry for a user in a guild, loading it on the database thread on first access."""
+        key = (guild_id, user_id)
+        while True:
+            # Under the lock, so a flush evicting idle entries either runs first or sees this use
+            with self.lock:
+                entry = self.entries[lifetime].get(key)
+                if entry is not None:
+                    entry.seen = self.flushes
+                    return entry
+                generation = self.generation[lifetime]
+            row = await get_board(lifetime).afetchone(SELECT_SQL.format(table=board_table(lifetime)), key)
+            entry = self._store(key, lifetime, row, create, generation)
+            if entry is not _STALE:
+                return entry
+
+    def _store(self, key: tuple[int, str], lifetime: bool, row, create: bool, generation: int):
+        """Cache a row read while the board was at `generation`.
+
+        Returns _STALE if the board was rewritten since (reset, restore,
+        import, ...), as the row may be from before; the caller reads again.
+        """
+        with self.lock:
+            if self.generation[lifetime] != generation:
+                return _STALE
+            board = self.entries[lifetime]
+            # Another caller may have loaded (and changed) the entry while this one was reading
+            entry = board.get(key)
+            if entry is None:
+                if row:
+                    entry = XPEntry(*row)
+                elif create:
+                    entry = XPEntry()
+                else:
+                    return None
+                entry.generation = generation
+                board[key] = entry
+            entry.seen = self.flushes
+            return entry
+
+    def mark_dirty(self, guild_id: int, user_id: str, lifetime: bool, entry: XPEntry):
+        """Queue a changed entry for the next flush.
+
+        An entry evicted while the caller was changing it is put back, unless
+        the board was rewritten since it was loaded.
+        """
+        key = (guild_id, user_id)
+        with self.lock:
+            board = self.entries[lifetime]
+            if key not in board:
+                if entry.generation != self.generation[lifetime]:
+                    return
+                board[key] = entry
+            entry.seen = self.flushes
+            self.dirty[lifetime].add(key)
+
+    def invalidate(self, lifetime=None):
+        """Drop cached entries and pending writes for one board (or both).
+
+        Also bumps the board's generation, which tells views holding rows
+        from it (such as open leaderboards) to re-read them.
+        """
+        boards = (True, False) if lifetime is None else (lifetime,)
+        with self.lock:
+            for board in boards:
+                self.entries[board] = {}
+                self.dirty[board] = set()
+                self.generation[board] += 1
+
+    def exclusive(self, lifetime: bool, func, *args):
+        """Run a blocking rewrite of a board's database with flushing held off.
+
+        Pending writes are flushed first and the board's cache is dropped
+        afterwards, so the rewrite is never overwritten by stale entries.
+        """
+        with self.flush_lock:
+            self.flush()
+            try:
+                return func(*args)
+            finally:
+                self.invalidate(lifetime)
+
+    async def aexclusive(self, lifetime: bool, func, *args):
+        """exclusive() run on the database thread."""
+        return await run_blocking(self.exclusive, lifetime, func, *args)
+
+    async def aflush(self) -> int:
+        """flush() run on the database thread."""
+        return await run_blocking(self.flush)
+
+    def flush(self) -> int:
+        """Write every dirty entry to both boards in one transaction. Blocking."""
+        with self.flush_lock:
+            with self.lock:
+                pending, self.dirty = self.dirty, {True: set(), False: set()}
+                rows = {}
+                for lifetime, keys in pending.items():
+                    board = self.entries[lifetime]
+                    rows[lifetime] = [
+                        (*key, board[key].xp, board[key].level, board[key].last_message)
+                        for key in keys if key in board
+                    ]
+
+            if not rows[True] and not rows[False]:
+                self._evict()
+                return 0
+
+            try:
+                with get_board().transaction() as conn:
+                    for lifetime, board_rows in rows.items():
+                        if board_rows:
+                            conn.executemany(UPSERT_SQL.format(table=board_table(lifetime)), board_rows)
+            except Exception:
+                # Keep the entries dirty so the next flush retries them
+                with self.lock:
+                    for lifetime, keys in pending.items():
+                        self.dirty[lifetime] |= keys
+                raise
+
+            self._evict()
+            return len(rows[True]) + len(rows[False])
+
+    def _evict(self):
+        """Drop clean entries not used since the previous flush, then start a new interval."""
+        with self.lock:
+            for lifetime, board in self.entries.items():
+                dirty = self.dirty[lifetime]
+                idle = [key for key, entry in board.items() if entry.seen < self.flushes and key not in dirty]
+                for key in idle:
+                    del board[key]
+            self.flushes += 1
+
+accumulator = XPAccumulator()
@@ -1,44 +1,33 @@
 import time
-from .database import get_db
+from .accumulator import accumulator
 from .utils import get_multiplier, random_xp, can_get_xp, check_level_up
-from .exclude_channels import is_channel_excluded
+from .exclusions import excluded_channels
 
 async def add_xp(member):
     
-    if hasattr(member, "guild"):
-        last_message = getattr(member, "last_message", None)
-        if last_message and getattr(last_message, "channel", None):
-            if is_channel_excluded(last_message.channel.id):
-                return
+    guild = getattr(member, "guild", None)
+    if guild is None:
+        return  # Boards are per guild, so there is nothing to earn in DMs
+
+    last_message = getattr(member, "last_message", None)
+    channel = getattr(last_message, "channel", None) if last_message else None
+    if channel and excluded_channels.is_excluded(channel.id, getattr(channel, "category_id", None)):
+        return
     
     base_xp = random_xp()
+    user_id = str(member.id)
 
     for lifetime in (True, False):  # True = lifetime, False = annual
-        conn, cur = get_db(lifetime)
-        cur.execute("SELECT xp, level, last_message FROM xp WHERE user_id = ?", (str(member.id),))
-        row = cur.fetchone()
-
-        if row:
-            xp, level, last_msg = row
-            if not can_get_xp(last_msg):
-                conn.close()
-                continue
-        else:
-            xp, level, last_msg = (0, 0, 0)
-            cur.execute(
-                "INSERT INTO xp (user_id, xp, level, last_message) VALUES (?, ?, ?, ?)",
-                (str(member.id), 0, 0, 0)
-            )
+        # Cached entry; the accumulator writes it back to the database in batches
+        entry = await accumulator.aget(guild.id, user_id, lifetime, create=True)
+        if not can_get_xp(entry.last_message):
+            continue
 
         # Only apply multiplier for lifetime XP
         gained = int(base_xp * get_multiplier(member, apply_multiplier=lifetime))
-        new_xp = xp + gained
-
-        cur.execute(
-            "UPDATE xp SET xp = ?, last_message = ? WHERE user_id = ?",
-            (new_xp, int(time.time()), str(member.id))
-        )
-        conn.commit()
-
-        await check_level_up(member, cur, conn, lifetime)
-        conn.close()
\ No newline at end of file
+        entry.xp += gained
+        entry.last_message = int(time.time())
+        try:
+            await check_level_up(member, entry, lifetime)
+        finally:
+            accumulator.mark_dirty(guild.id, user_id, lifetime, entry)
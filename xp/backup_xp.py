@@ -2,12 +2,15 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 import os
-import shutil
+import asyncio
 from datetime import datetime, timedelta
 from moderation.loader import ModerationBase
+from xp.accumulator import accumulator
+from xp.database import get_board, DB_PATH
+from xp.snapshots import create_snapshot, apply_retention, write_diff, FULL_BACKUP_NAME
 
 BACKUP_CHANNEL_ID = 946421558778417172
-BACKUP_INTERVAL = timedelta(days=7)
+BACKUP_INTERVAL = timedelta(days=1)
 
 class BackupXP(commands.Cog):
     def __init__(self, bot):
@@ -16,9 +19,11 @@ class BackupXP(commands.Cog):
         self.backup_dir = os.path.join(self.base_dir, "backups")
         self.last_backup_file = os.path.join(self.backup_dir, "last_backup.txt")
         os.makedirs(self.backup_dir, exist_ok=True)
+        self.lock = asyncio.Lock()  # Full and differential backups must not interleave
 
-        # Start the daily check task
+        # Start the daily check task and hourly diffs
         self.auto_backup_task.start()
+        self.diff_backup_task.start()
 
     async def cog_load(self):
         """Check on startup if a backup is due"""
@@ -26,21 +31,56 @@ class BackupXP(commands.Cog):
 
     def cog_unload(self):
         self.auto_backup_task.cancel()
+        self.diff_backup_task.cancel()
 
-    @app_commands.command(name="backup_xp", description="Backup both lifetime and annual XP databases")
+    @app_commands.command(name="backup_xp", description="Backup the lifetime and annual XP boards")
+    @app_commands.describe(differential="Only save rows changed since the last backup (default: full backup)")
     @ModerationBase.is_admin()
-    async def backup_xp(self, interaction: discord.Interaction):
+    async def backup_xp(self, interaction: discord.Interaction, differential: bool = False):
         await interaction.response.defer(ephemeral=False)
-        success, message = await self.create_backup()
+        if differential:
+            success, message = await self.create_diff_backup()
+        else:
+            success, message = await self.create_backup()
         await interaction.followup.send(message)
 
+    @tasks.loop(hours=1)
+    async def diff_backup_task(self):
+        """Saves the rows changed in the last hour"""
+        if not os.path.exists(self.last_backup_file):
+            return  # Diffs need a full backup to apply to
+        success, message = await self.create_diff_backup()
+        print(message)
+
+    async def create_diff_backup(self):
+        """Write a differential backup of each board from its change log"""
+        try:
+            async with self.lock:
+                await accumulator.aflush()
+                # Stamped once the lock is held, so it orders correctly against full backups
+                now = datetime.now()
+                results = []
+                for name, lifetime in (("lifetime", True), ("annual", False)):
+                    # On the database thread, so the log is read and cleared atomically
+                    path, rows = await get_board(lifetime).run(write_diff, self.backup_dir, lifetime, now)
+                    results.append((name, path, rows))
+        except Exception as e:
+            return False, f"❌ Differential backup failed: `{e}`"
+
+        lines = [
+            f"**{name.capitalize()}:** `{os.path.basename(path)}` ({rows:,} changed rows)" if path
+            else f"**{name.capitalize()}:** no changes"
+            for name, path, rows in results
+        ]
+        return True, "✅ Differential backup complete!\n" + "\n".join(lines)
+
     @tasks.loop(hours=24)
     async def auto_backup_task(self):
-        """Runs daily and checks if a weekly backup is due"""
+        """Runs daily and checks if a backup is due"""
         await self.check_last_backup()
 
     async def check_last_backup(self):
-        """Check if the last backup was over 7 days ago or if no backup exists"""
+        """Check if the last backup was over a day ago or if no backup exists"""
         now = datetime.now()
 
         if not os.path.exists(self.last_backup_file):
@@ -55,40 +95,40 @@ class BackupXP(commands.Cog):
                 last_time = datetime.min
 
         if now - last_time >= BACKUP_INTERVAL:
-            await self.create_backup(log_channel=True, reason="Auto weekly backup")
+            await self.create_backup(log_channel=True, reason="Auto daily backup")
 
     async def create_backup(self, log_channel=False, reason=None):
         """Handles the actual backup logic"""
-        lifetime_db = os.path.join(self.base_dir, "lifetime.db")
-        annual_db = os.path.join(self.base_dir, "annual.db")
+        if not os.path.exists(DB_PATH):
+            return False, f"❌ Missing database file: {os.path.basename(DB_PATH)}"
 
-        missing = [db for db in [lifetime_db, annual_db] if not os.path.exists(db)]
-        if missing:
-            return False, f"❌ Missing database files: {', '.join(os.path.basename(m) for m in missing)}"
+        try:
+            async with self.lock:
+                # Include XP still buffered in memory
+                await accumulator.aflush()
+                now = datetime.now()
 
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        lifetime_backup = os.path.join(self.backup_dir, f"lifetime_{timestamp}.db")
-        annual_backup = os.path.join(self.backup_dir, f"annual_{timestamp}.db")
+                # Snapshot and compress in a worker thread, off the loop and the database thread
+                backup = await asyncio.to_thread(create_snapshot, DB_PATH, self.backup_dir, FULL_BACKUP_NAME, now)
 
-        try:
-            shutil.copy2(lifetime_db, lifetime_backup)
-            shutil.copy2(annual_db, annual_backup)
+                # Record last backup time
+                with open(self.last_backup_file, "w") as f:
+                    f.write(datetime.now().isoformat())
 
-            # Record last backup time
-            with open(self.last_backup_file, "w") as f:
-                f.write(datetime.now().isoformat())
+                # Backups from before xp.db (lifetime_*/annual_*.db) are left alone
+                removed = await asyncio.to_thread(
+                    apply_retention, self.backup_dir, FULL_BACKUP_NAME, ("lifetime", "annual")
+                )
 
-            # File sizes
-            lifetime_size = os.path.getsize(lifetime_db) / (1024 * 1024)
-            annual_size = os.path.getsize(annual_db) / (1024 * 1024)
-            total_size = lifetime_size + annual_size
+            # File size
+            size = os.path.getsize(backup) / (1024 * 1024)
 
             msg = (
-                f"✅ Databases backed up successfully! ({reason or 'Manual backup'})\n"
-                f"**Lifetime:** `{os.path.basename(lifetime_backup)}` ({lifetime_size:.2f} MB)\n"
-                f"**Annual:** `{os.path.basename(annual_backup)}` ({annual_size:.2f} MB)\n"
-                f"**Total size:** {total_size:.2f} MB"
+                f"✅ XP database backed up successfully! ({reason or 'Manual backup'})\n"
+                f"**Lifetime and annual:** `{os.path.basename(backup)}` ({size:.2f} MB compressed)"
             )
+            if removed:
+                msg += f"\nPruned {len(removed)} old backup(s)."
 
             if log_channel:
                 channel = self.bot.get_channel(BACKUP_CHANNEL_ID)
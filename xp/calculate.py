@@ -1,8 +1,10 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from .database import get_db
-from .utils import xp_for_level, can_get_xp, get_multiplier, load_config
+from .accumulator import accumulator
+from .utils import xp_for_level, can_get_xp
+from .multipliers import multiplier_resolver
+from .config import config
 import time
 
 class CalculateCommand(commands.Cog):
@@ -29,28 +31,23 @@ class CalculateCommand(commands.Cog):
         if user is None:
             user = interaction.user
 
-        # Load config fresh
-        config = load_config()
-        COOLDOWN = config["COOLDOWN"]
-        random_xp_config = config.get("RANDOM_XP", {"min": 50, "max": 100})
+        COOLDOWN = config.cooldown
+        random_xp_min, random_xp_max = config.random_xp
 
         # Determine which database to use
         use_lifetime = True if (board_type is None or board_type.value == "lifetime") else False
         board_name = "Lifetime" if use_lifetime else "Annual"
 
-        conn, cur = get_db(lifetime=use_lifetime)
-        cur.execute("SELECT xp, level, last_message FROM xp WHERE user_id = ?", (str(user.id),))
-        row = cur.fetchone()
-        conn.close()
+        entry = await accumulator.aget(interaction.guild_id, str(user.id), lifetime=use_lifetime)
 
-        if not row:
+        if not entry:
             await interaction.response.send_message(
                 f"{user.mention} has no XP yet on the **{board_name}** board.",
                 ephemeral=True
             )
             return
         
-        current_xp, current_level, last_message = row
+        current_xp, current_level, last_message = entry.xp, entry.level, entry.last_message
 
         if level <= current_level:
             await interaction.response.send_message(
@@ -62,10 +59,10 @@ class CalculateCommand(commands.Cog):
         target_xp = xp_for_level(level)
         remaining_xp = target_xp - current_xp
 
-        multiplier = get_multiplier(user, apply_multiplier=True)
+        multiplier, _ = multiplier_resolver.resolve(user)
 
-        min_xp_per_msg = int(random_xp_config["min"] * multiplier)
-        max_xp_per_msg = int(random_xp_config["max"] * multiplier)
+        min_xp_per_msg = int(random_xp_min * multiplier)
+        max_xp_per_msg = int(random_xp_max * multiplier)
         avg_xp_per_msg = (min_xp_per_msg + max_xp_per_msg) / 2
 
         max_messages = int(remaining_xp / min_xp_per_msg)
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+import traceback
+from pathlib import Path
+
+CONFIG_PATH = Path("/home/lilacrose/lilacrose.dev2.0/bots/lacie/xp_config.json")
+CHECK_INTERVAL = 2  # Seconds between mtime checks on the config file
+
+DEFAULT_CURVE = {"base": 1, "square": 50, "linear": 100, "divisor": 100}
+DEFAULT_RANDOM_XP = {"min": 50, "max": 100}
+
+class XPConfig:
+    """xp_config.json, parsed once and hot-reloaded when the file changes.
+
+    Accessors return values already converted to their proper types, so
+    callers never touch the raw JSON. Callbacks registered with on_reload()
+    run after every successful reload.
+    """
+
+    def __init__(self, path: Path = CONFIG_PATH):
+        self.path = path
+        self.raw = {}
+        self.mtime = None
+        self.last_check = 0.0
+        self.listeners = []
+
+    def on_reload(self, callback):
+        """Register a callback to run whenever the config is reloaded."""
+        self.listeners.append(callback)
+
+    def reload(self):
+        """Re-read the config file. Raises if the file is missing or invalid."""
+        mtime = os.stat(self.path).st_mtime
+        with self.path.open() as f:
+            raw = json.load(f)
+
+        self._multipliers = {int(k): v for k, v in raw["MULTIPLIERS"].items()}
+        self._role_rewards = {int(k): int(v) for k, v in raw["ROLE_REWARDS"].items()}
+        self._cooldown = raw["COOLDOWN"]
+        random_xp = raw.get("RANDOM_XP", DEFAULT_RANDOM_XP)
+        self._random_xp = (int(random_xp["min"]), int(random_xp["max"]))
+        self._curve = dict(raw.get("XP_CURVE", DEFAULT_CURVE))
+        self.raw = raw
+        self.mtime = mtime
+
+        for callback in self.listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"XP config reload callback failed: {e}")
+                traceback.print_exc()
+
+    def refresh(self):
+        """Reload the config if the file changed since it was last read."""
+        if self.mtime is None:
+            self.reload()
+            return
+
+        now = time.monotonic()
+        if now - self.last_check < CHECK_INTERVAL:
+            return
+        self.last_check = now
+
+        try:
+            if os.stat(self.path).st_mtime != self.mtime:
+                self.reload()
+        except Exception as e:
+            # Keep serving the last good config until the file is fixed
+            print(f"Failed to reload XP config: {e}")
+
+    @property
+    def multipliers(self) -> dict[int, float]:
+        """Role ID -> XP multiplier."""
+        self.refresh()
+        return self._multipliers
+
+    @property
+    def role_rewards(self) -> dict[int, int]:
+        """Level -> reward role ID."""
+        self.refresh()
+        return self._role_rewards
+
+    @property
+    def cooldown(self) -> int:
+        """Seconds between messages that award XP."""
+        self.refresh()
+        return self._cooldown
+
+    @property
+    def random_xp(self) -> tuple[int, int]:
+        """Inclusive (min, max) XP awarded per message."""
+        self.refresh()
+        return self._random_xp
+
+    @property
+    def curve(self) -> dict:
+        """Coefficients of the level curve used by xp_for_level."""
+        self.refresh()
+        return self._curve
+
+config = XPConfig()
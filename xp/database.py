@@ -1,20 +1,340 @@
-import sqlite3
 import os
+import re
+from dotenv import load_dotenv
+from core.database import get_database
+
+load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "xp.db")
+
+# Both boards live in xp.db, one table each, so a flush is one transaction on one file
+BOARD_TABLES = {True: "xp_lifetime", False: "xp_annual"}
+LEGACY_FILES = {True: "lifetime.db", False: "annual.db"}  # One file per board, before xp.db
+HOME_GUILD_ID = 876772600704020530  # The server the bot was written for
+# Rows from before boards were per guild belong to the bot's home server; set GUILD_ID in .env to use another
+LEGACY_GUILD_ID = int(os.getenv("GUILD_ID") or HOME_GUILD_ID)
 
-def get_db(lifetime=True):
-    db_name = "lifetime.db" if lifetime else "annual.db"
-    db_path = os.path.join(BASE_DIR, db_name)
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS xp (
-        user_id TEXT PRIMARY KEY,
+# Each board holds every server's rows, keyed by (guild_id, user_id)
+TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        guild_id INTEGER NOT NULL,
+        user_id TEXT NOT NULL,
         xp INTEGER DEFAULT 0,
         level INTEGER DEFAULT 0,
-        last_message INTEGER DEFAULT 0
+        last_message INTEGER DEFAULT 0,
+        PRIMARY KEY (guild_id, user_id)
+    )
+"""
+# Covers rank counts and leaderboard pages, which only read one guild's rows
+INDEX_TEMPLATE = "CREATE INDEX IF NOT EXISTS idx_{table}_rank ON {table} (guild_id, xp DESC, user_id, level)"
+
+# Users whose row changed since the last differential backup, kept by triggers.
+# The triggers use an upsert rather than OR IGNORE, because the conflict policy
+# of the statement firing them (the accumulator's upsert) would override OR IGNORE.
+CHANGES_SQL = """
+    CREATE TABLE IF NOT EXISTS xp_changes (
+        board TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        user_id TEXT NOT NULL,
+        PRIMARY KEY (board, guild_id, user_id)
+    ) WITHOUT ROWID
+"""
+TRIGGER_EVENTS = (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD"))
+TRIGGER_TEMPLATE = """
+    CREATE TRIGGER IF NOT EXISTS {table}_log_{event} AFTER {event} ON {table}
+    BEGIN
+        INSERT INTO xp_changes (board, guild_id, user_id) VALUES ('{board}', {row}.guild_id, {row}.user_id)
+        ON CONFLICT(board, guild_id, user_id) DO NOTHING;
+    END
+"""
+# Small key/value store; the annual board records which year it is counting here
+META_SQL = "CREATE TABLE IF NOT EXISTS xp_meta (key TEXT PRIMARY KEY, value TEXT)"
+
+ARCHIVE_GLOB = "xp_[0-9][0-9][0-9][0-9]"  # Archived annual boards, xp_<year>
+STAGING_TABLE = "xp_import"  # Filled by bulk loads, then swapped in for a board
+
+def board_name(lifetime: bool) -> str:
+    return "lifetime" if lifetime else "annual"
+
+def board_table(lifetime: bool) -> str:
+    """Name of a board's table in xp.db."""
+    return BOARD_TABLES[lifetime]
+
+def _board_statements(lifetime: bool) -> list[str]:
+    table = board_table(lifetime)
+    return [
+        TABLE_TEMPLATE.format(table=table),
+        INDEX_TEMPLATE.format(table=table),
+        *(TRIGGER_TEMPLATE.format(table=table, event=event, row=row, board=board_name(lifetime))
+          for event, row in TRIGGER_EVENTS),
+    ]
+
+SCHEMA_STATEMENTS = [CHANGES_SQL, META_SQL, *_board_statements(True), *_board_statements(False)]
+SCHEMA = ";\n".join(SCHEMA_STATEMENTS) + ";"
+
+def has_guild_key(conn, table: str) -> bool:
+    return any(row[1] == "guild_id" for row in conn.execute(f"PRAGMA table_info({table})"))
+
+def add_guild_key(conn, table: str):
+    """Rebuild a board table from before per-guild keys, giving its rows to LEGACY_GUILD_ID.
+
+    Runs inside the caller's transaction. The table's index and triggers
+    are dropped with the old table and must be created again afterwards.
+    """
+    conn.execute(f"ALTER TABLE {table} RENAME TO {table}_unkeyed")
+    conn.execute(TABLE_TEMPLATE.format(table=table))
+    conn.execute(
+        f"""
+        INSERT INTO {table} (guild_id, user_id, xp, level, last_message)
+        SELECT ?, user_id, xp, level, last_message FROM {table}_unkeyed
+        """,
+        (LEGACY_GUILD_ID,)
+    )
+    conn.execute(f"DROP TABLE {table}_unkeyed")
+
+def migrate_guild_keys(conn):
+    """Key the boards, archives and change log in xp.db by guild, once.
+
+    Runs before the schema, whose indexes and triggers need the guild_id column.
+    """
+    tables = [
+        name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND (name IN (?, ?) OR name GLOB ?)",
+            (*BOARD_TABLES.values(), ARCHIVE_GLOB)
+        )
+    ]
+    unkeyed = [table for table in tables if not has_guild_key(conn, table)]
+    changes = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'xp_changes'").fetchone()
+    old_changes = changes is not None and not has_guild_key(conn, "xp_changes")
+    if not unkeyed and not old_changes:
+        return
+
+    try:
+        conn.execute("BEGIN")
+        for table in unkeyed:
+            add_guild_key(conn, table)
+            if table not in BOARD_TABLES.values():
+                conn.execute(INDEX_TEMPLATE.format(table=table))  # The schema rebuilds the boards' own
+        if old_changes:
+            conn.execute("ALTER TABLE xp_changes RENAME TO xp_changes_unkeyed")
+            conn.execute(CHANGES_SQL)
+            conn.execute(
+                "INSERT INTO xp_changes (board, guild_id, user_id) SELECT board, ?, user_id FROM xp_changes_unkeyed",
+                (LEGACY_GUILD_ID,)
+            )
+            conn.execute("DROP TABLE xp_changes_unkeyed")
+        conn.commit()
+        print(f"Keyed {len(unkeyed)} XP table(s) by guild")
+    except Exception:
+        conn.rollback()
+        raise
+
+def migrate_legacy(conn):
+    """Copy both boards out of lifetime.db and annual.db into xp.db, once.
+
+    Archived annual boards and the annual board's year come along too, with
+    every row given to LEGACY_GUILD_ID. The old files are left in place,
+    untouched, as a fallback.
+    """
+    if conn.execute("SELECT 1 FROM xp_meta WHERE key = 'legacy_migrated'").fetchone():
+        return
+
+    attached = []
+    try:
+        for lifetime, filename in LEGACY_FILES.items():
+            path = os.path.join(BASE_DIR, filename)
+            if os.path.exists(path):
+                alias = f"legacy_{board_name(lifetime)}"
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+                attached.append((lifetime, alias))
+
+        conn.execute("BEGIN")
+        for lifetime, alias in attached:
+            tables = {name for name, in conn.execute(f"SELECT name FROM {alias}.sqlite_master WHERE type = 'table'")}
+            if "xp" in tables:
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO {board_table(lifetime)} (guild_id, user_id, xp, level, last_message)
+                    SELECT ?, user_id, xp, level, last_message FROM {alias}.xp
+                    """,
+                    (LEGACY_GUILD_ID,)
+                )
+            if lifetime:
+                continue
+            for name in sorted(tables):
+                if re.fullmatch(r"xp_\d{4}", name):
+                    create_archive(conn, name)
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {name} SELECT ?, user_id, xp, level, last_message FROM {alias}.{name}",
+                        (LEGACY_GUILD_ID,)
+                    )
+            if "xp_meta" in tables:
+                conn.execute(f"INSERT OR REPLACE INTO xp_meta SELECT key, value FROM {alias}.xp_meta WHERE key = 'year'")
+        conn.execute("INSERT INTO xp_meta (key, value) VALUES ('legacy_migrated', '1')")
+        conn.commit()
+        if attached:
+            print(f"Migrated XP boards from {', '.join(LEGACY_FILES[lifetime] for lifetime, _ in attached)} into xp.db")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        for _, alias in attached:
+            conn.execute(f"DETACH DATABASE {alias}")
+
+def get_board(lifetime=True):
+    """Return the shared Database holding the lifetime and annual boards.
+
+    Both boards are tables in the same file (see board_table), so this
+    returns the same Database whichever board is asked for.
+    """
+    db = get_database(DB_PATH)
+    db.add_migration(migrate_guild_keys)
+    db.add_migration(SCHEMA)
+    db.add_migration(migrate_legacy)
+    return db
+
+def create_schema(cur):
+    """Create both board tables, their ranking indexes and the change log if they don't exist."""
+    for statement in SCHEMA_STATEMENTS:
+        cur.execute(statement)
+
+def create_staging(conn, table: str = STAGING_TABLE):
+    """Create an empty table shaped like a board, replacing any leftover one."""
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(TABLE_TEMPLATE.format(table=table))
+
+def create_archive(conn, table: str):
+    """Create an archived annual board table with its ranking index."""
+    conn.execute(TABLE_TEMPLATE.format(table=table))
+    conn.execute(INDEX_TEMPLATE.format(table=table))
+
+def log_board(conn, lifetime: bool, table: str | None = None):
+    """Log every user in a table as changed on a board, for writes that bypass the triggers."""
+    conn.execute(
+        f"INSERT OR IGNORE INTO xp_changes (board, guild_id, user_id) SELECT ?, guild_id, user_id FROM {table or board_table(lifetime)}",
+        (board_name(lifetime),)
+    )
+
+def swap_in_staging(conn, lifetime: bool, guild_id: int, table: str = STAGING_TABLE):
+    """Replace one guild's rows on a board with a fully loaded staging table.
+
+    Runs inside the caller's transaction. Other guilds share the board
+    table, so the guild's rows are replaced in place rather than the table
+    swapped; the triggers log every user changed.
+    """
+    target = board_table(lifetime)
+    conn.execute(f"DELETE FROM {target} WHERE guild_id = ?", (guild_id,))
+    conn.execute(
+        f"""
+        INSERT INTO {target} (guild_id, user_id, xp, level, last_message)
+        SELECT guild_id, user_id, xp, level, last_message FROM {table} WHERE guild_id = ?
+        """,
+        (guild_id,)
+    )
+    conn.execute(f"DROP TABLE {table}")
+
+def archive_table(year: int) -> str:
+    """Name of the table holding a past year's annual board."""
+    return f"xp_{int(year)}"
+
+def archived_years() -> list[int]:
+    """Years with an archived annual board, newest first."""
+    rows = get_board(lifetime=False).fetchall(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?", (ARCHIVE_GLOB,)
     )
-    """)
-    conn.commit()
-    return conn, cur
+    return sorted((int(name[3:]) for name, in rows), reverse=True)
+
+def get_board_year(conn, default: int) -> int:
+    """Year the annual board is counting, recording `default` if it was never set."""
+    conn.execute("INSERT OR IGNORE INTO xp_meta (key, value) VALUES ('year', ?)", (str(default),))
+    return int(conn.execute("SELECT value FROM xp_meta WHERE key = 'year'").fetchone()[0])
+
+def rollover_annual(year: int, new_year: int) -> int:
+    """Archive the annual board as xp_<year> and start an empty one for new_year. Blocking.
+
+    The board is renamed rather than copied or deleted, so the swap takes
+    the same time however many users it holds. Every archived user is
+    logged as changed for the next differential backup. The archive's rank
+    index is built after the swap. Returns the number of users archived.
+    """
+    archive = archive_table(year)
+    table = board_table(False)
+    db = get_board(lifetime=False)
+    with db.lock:
+        with db.transaction() as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (archive,)).fetchone():
+                raise ValueError(f"The {year} annual board is already archived")
+            if not conn.in_transaction:
+                conn.execute("BEGIN")  # sqlite3 doesn't open a transaction for DDL by itself
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            log_board(conn, False)
+            # The index and triggers would follow the table, so drop them and recreate on the new board
+            conn.execute(f"DROP INDEX IF EXISTS idx_{table}_rank")
+            for event, _ in TRIGGER_EVENTS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {table}_log_{event}")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {archive}")
+            create_schema(conn)
+            conn.execute("INSERT OR REPLACE INTO xp_meta (key, value) VALUES ('year', ?)", (str(new_year),))
+        db.execute(INDEX_TEMPLATE.format(table=archive))
+    return count
+
+def restore_board(lifetime: bool, guild_id: int, path: str, source_table: str):
+    """Replace a guild's rows on a board with its rows in `source_table` of a validated backup. Blocking.
+
+    The other board and other guilds are left alone. The triggers log every
+    user present before or after, so the next differential backup carries
+    the restore.
+    """
+    table = board_table(lifetime)
+    db = get_board(lifetime)
+    with db.lock:
+        conn = db.conn
+        conn.execute("ATTACH DATABASE ? AS restore_src", (path,))
+        try:
+            with db.transaction() as conn:
+                conn.execute(f"DELETE FROM {table} WHERE guild_id = ?", (guild_id,))
+                conn.execute(
+                    f"""
+                    INSERT INTO {table} (guild_id, user_id, xp, level, last_message)
+                    SELECT guild_id, user_id, xp, level, last_message FROM restore_src.{source_table}
+                    WHERE guild_id = ?
+                    """,
+                    (guild_id,)
+                )
+        finally:
+            conn.execute("DETACH DATABASE restore_src")
+
+def get_rank(lifetime: bool, guild_id: int, xp: int) -> tuple[int, int]:
+    """Return (position, total users) for an XP value in a guild using the board's index."""
+    above = get_board(lifetime).fetchone(
+        f"SELECT COUNT(*) FROM {board_table(lifetime)} WHERE guild_id = ? AND xp > ?", (guild_id, xp)
+    )[0]
+    return above + 1, max(count_users(lifetime, guild_id), above + 1)
+
+def get_leaderboard_rows(lifetime: bool, guild_id: int, after: tuple[int, str] | None = None, limit: int = 100, table: str | None = None):
+    """Return a guild's (user_id, xp, level) rows ordered by XP, starting after an (xp, user_id) key.
+
+    `table` may name an archived annual board (see archive_table).
+    """
+    db = get_board(lifetime)
+    table = table or board_table(lifetime)
+    if after is None:
+        return db.fetchall(
+            f"SELECT user_id, xp, level FROM {table} WHERE guild_id = ? ORDER BY xp DESC, user_id LIMIT ?",
+            (guild_id, limit)
+        )
+    after_xp, after_id = after
+    return db.fetchall(
+        f"""
+        SELECT user_id, xp, level FROM {table}
+        WHERE guild_id = ? AND xp <= ? AND (xp < ? OR user_id > ?)
+        ORDER BY xp DESC, user_id LIMIT ?
+        """,
+        (guild_id, after_xp, after_xp, after_id, limit)
+    )
+
+def count_users(lifetime: bool, guild_id: int, table: str | None = None) -> int:
+    return get_board(lifetime).fetchone(
+        f"SELECT COUNT(*) FROM {table or board_table(lifetime)} WHERE guild_id = ?", (guild_id,)
+    )[0]
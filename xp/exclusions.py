@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import threading
+
+EXCLUDED_FILE = os.path.join(os.path.dirname(__file__), "excluded_channels.json")
+
+class ExcludedChannels:
+    """Channel and category IDs that never award XP.
+
+    The IDs live in memory as a frozenset, so checking a message is a set
+    lookup. excluded_channels.json is read once and rewritten atomically
+    whenever the set changes.
+    """
+
+    def __init__(self, path: str = EXCLUDED_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self._ids = None
+
+    @property
+    def ids(self) -> frozenset[int]:
+        if self._ids is None:
+            with self.lock:
+                if self._ids is None:
+                    self._ids = self._load()
+        return self._ids
+
+    def _load(self) -> frozenset[int]:
+        if not os.path.exists(self.path):
+            return frozenset()
+        with open(self.path, "r") as f:
+            return frozenset(int(i) for i in json.load(f))
+
+    def _save(self, ids: frozenset[int]):
+        """Write the IDs to a temp file and swap it in, so the file is never half-written."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(sorted(ids), f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _update(self, ids: frozenset[int]):
+        self._save(ids)
+        self._ids = ids
+
+    def add(self, id_: int) -> bool:
+        """Exclude a channel or category. Returns False if it already was."""
+        with self.lock:
+            ids = self._ids if self._ids is not None else self._load()
+            if id_ in ids:
+                return False
+            self._update(ids | {id_})
+            return True
+
+    def remove(self, id_: int) -> bool:
+        """Re-enable a channel or category. Returns False if it wasn't excluded."""
+        with self.lock:
+            ids = self._ids if self._ids is not None else self._load()
+            if id_ not in ids:
+                return False
+            self._update(ids - {id_})
+            return True
+
+    def is_excluded(self, channel_id: int, category_id: int | None = None) -> bool:
+        """Check whether a channel, or the category it belongs to, is excluded."""
+        ids = self.ids
+        return channel_id in ids or (category_id is not None and category_id in ids)
+
+excluded_channels = ExcludedChannels()
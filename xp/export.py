@@ -1,84 +1,162 @@
 import os
 import json
+import gzip
 import asyncio
-from io import BytesIO
+import tempfile
 import discord
 from discord import app_commands
 from discord.ext import commands
-from xp.database import get_db
+from xp.database import get_board, board_table
+from xp.accumulator import accumulator
 from moderation.loader import ModerationBase
 
+EXPORT_BATCH = 5000  # Rows read per query while streaming the board
+UPLOAD_MARGIN = 256 * 1024  # Headroom under the upload limit for data still buffered in the compressor
+MAX_ATTACHMENTS = 10  # Discord's per-message attachment cap
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024  # Upload limit outside of guilds
+
+SELECT_SQL = "SELECT user_id, xp, level, last_message FROM {table} WHERE guild_id = ? AND user_id > ? ORDER BY user_id LIMIT ?"
+
+class ExportWriter:
+    """Writes exported rows to numbered part files, starting a new part at the size limit.
+
+    Every part is a complete document on its own: a {"users": {...}} object
+    for JSON, or one {"user_id": ..., ...} object per line for NDJSON.
+    """
+
+    def __init__(self, directory: str, basename: str, ndjson: bool, compress: bool, limit: int):
+        self.directory = directory
+        self.basename = basename
+        self.ndjson = ndjson
+        self.compress = compress
+        self.limit = limit - UPLOAD_MARGIN
+        self.paths = []
+        self.raw = None
+        self.out = None
+        self.rows_in_part = 0
+
+    @property
+    def extension(self) -> str:
+        ext = ".ndjson" if self.ndjson else ".json"
+        return ext + ".gz" if self.compress else ext
+
+    def _open_part(self):
+        path = os.path.join(self.directory, f"{self.basename}_part{len(self.paths) + 1}{self.extension}")
+        self.paths.append(path)
+        self.raw = open(path, "wb")
+        self.out = gzip.GzipFile(fileobj=self.raw, mode="wb") if self.compress else self.raw
+        self.rows_in_part = 0
+        if not self.ndjson:
+            self.out.write(b'{"users": {')
+
+    def _close_part(self):
+        if not self.ndjson:
+            self.out.write(b"\n}}\n")
+        if self.out is not self.raw:
+            self.out.close()
+        self.raw.close()
+        self.raw = self.out = None
+
+    def write_rows(self, rows):
+        for user_id, xp, level, last_message in rows:
+            if self.raw is None:
+                self._open_part()
+            elif self.rows_in_part and self.raw.tell() >= self.limit:
+                self._close_part()
+                self._open_part()
+
+            if self.ndjson:
+                line = json.dumps({"user_id": str(user_id), "xp": xp, "level": level, "last_message": last_message}) + "\n"
+            else:
+                sep = ",\n" if self.rows_in_part else "\n"
+                line = f'{sep}{json.dumps(str(user_id))}: {json.dumps({"xp": xp, "level": level, "last_message": last_message})}'
+            self.out.write(line.encode("utf-8"))
+            self.rows_in_part += 1
+
+    def close(self) -> list[str]:
+        """Finish the current part and return every part's path."""
+        if self.raw is None and not self.paths:
+            self._open_part()  # Empty board, still produce a valid document
+        if self.raw is not None:
+            self._close_part()
+        if len(self.paths) == 1:
+            # Don't number the file when nothing was split
+            single = os.path.join(self.directory, f"{self.basename}{self.extension}")
+            os.replace(self.paths[0], single)
+            self.paths = [single]
+        return self.paths
+
 class ExportXP(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def _export_data(self, lifetime: bool):
-        """Async function to handle database operations in a thread"""
-        def _db_work():
-            try:
-                conn, cur = get_db(lifetime)
-                # Fetch all data at once as a list of dicts for faster processing
-                cur.execute("SELECT user_id, xp, level, last_message FROM xp")
-                rows = cur.fetchall()
-                conn.close()
-                
-                # Build dict directly in the thread
-                users = {}
-                for user_id, xp, level, last_msg in rows:
-                    users[str(user_id)] = {
-                        "xp": xp,
-                        "level": level,
-                        "last_message": last_msg
-                    }
-                return users
-            except Exception as e:
-                print(f"Error in _db_work: {e}")
-                raise
-        
-        # Run everything in thread pool
-        users = await asyncio.to_thread(_db_work)
-        return {"users": users}
+    async def _export_data(self, lifetime: bool, guild_id: int, writer: ExportWriter) -> int:
+        """Stream a guild's rows on the board into `writer` a batch at a time, returning the row count.
+
+        Rows are paged by user_id so each query is short and other database
+        work can run between batches; encoding and compression happen off
+        both the event loop and the database thread.
+        """
+        await accumulator.aflush()
+        db = get_board(lifetime)
+        sql = SELECT_SQL.format(table=board_table(lifetime))
+        count = 0
+        last_id = ""
+        while True:
+            rows = await db.afetchall(sql, (guild_id, last_id, EXPORT_BATCH))
+            if not rows:
+                break
+            await asyncio.to_thread(writer.write_rows, rows)
+            count += len(rows)
+            last_id = rows[-1][0]
+        return count
 
     @app_commands.command(name="export_xp", description="Export XP data to JSON (lifetime or annual)")
     @app_commands.choices(
         xp_type=[
             app_commands.Choice(name="Lifetime", value="lifetime"),
             app_commands.Choice(name="Annual", value="annual")
+        ],
+        file_format=[
+            app_commands.Choice(name="JSON", value="json"),
+            app_commands.Choice(name="NDJSON (one user per line)", value="ndjson")
         ]
     )
+    @app_commands.describe(compress="Gzip the export (default: yes)")
     @ModerationBase.is_admin()
-    async def export_xp(self, interaction: discord.Interaction, xp_type: app_commands.Choice[str]):
+    async def export_xp(
+        self,
+        interaction: discord.Interaction,
+        xp_type: app_commands.Choice[str],
+        file_format: app_commands.Choice[str] = None,
+        compress: bool = True
+    ):
         try:
             # Defer immediately
             await interaction.response.defer()
 
-            
             print(f"Export started for {xp_type.value}")
-            
+
             lifetime = xp_type.value == "lifetime"
-            
-            # Get data asynchronously
-            print("Fetching data from database...")
-            data = await self._export_data(lifetime)
-            print(f"Data fetched: {len(data['users'])} users")
-            
-            # Create file with pretty-printed JSON
-            print("Encoding JSON...")
-            json_str = json.dumps(data, indent=2)
-            json_bytes = json_str.encode("utf-8")
-            print(f"JSON size: {len(json_bytes)} bytes")
-            
-            print("Creating Discord file...")
-            file = discord.File(fp=BytesIO(json_bytes), filename=f"{xp_type.value}_xp_export.json")
-            
-            # Public response
-            print("Sending response...")
-            await interaction.followup.send(
-                f"✅ Exported `{xp_type.value}` XP data ({len(data['users'])} users).",
-                file=file
-            )
+            ndjson = file_format is not None and file_format.value == "ndjson"
+            limit = interaction.guild.filesize_limit if interaction.guild else DEFAULT_UPLOAD_LIMIT
+
+            with tempfile.TemporaryDirectory() as directory:
+                writer = ExportWriter(directory, f"{xp_type.value}_xp_export", ndjson, compress, limit)
+                try:
+                    count = await self._export_data(lifetime, interaction.guild_id, writer)
+                finally:
+                    paths = await asyncio.to_thread(writer.close)
+                print(f"Export written: {count} users in {len(paths)} file(s)")
+
+                summary = f"✅ Exported `{xp_type.value}` XP data ({count:,} users)"
+                if len(paths) > 1:
+                    summary += f" in {len(paths)} parts; attach them all to one `/import_xp` to load it back"
+                for start in range(0, len(paths), MAX_ATTACHMENTS):
+                    files = [discord.File(path) for path in paths[start:start + MAX_ATTACHMENTS]]
+                    await interaction.followup.send(summary + "." if start == 0 else None, files=files)
             print("Export complete!")
-            
+
         except Exception as e:
             print(f"Error in export_xp: {e}")
             import traceback
@@ -89,4 +167,4 @@ class ExportXP(commands.Cog):
                 pass
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(ExportXP(bot))
\ No newline at end of file
+    await bot.add_cog(ExportXP(bot))
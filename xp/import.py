@@ -1,120 +1,181 @@
-import json
 import asyncio
-from io import BytesIO
+import time
+import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands
-from xp.utils import xp_for_level
-from xp.database import get_db
+from xp.recalc import compute_levels
+from xp.database import get_board, create_staging, swap_in_staging, STAGING_TABLE
+from xp.accumulator import accumulator
+from xp.jsonstream import iter_users, iter_ndjson_users, gunzip
 from moderation.loader import ModerationBase
 
+IMPORT_BATCH = 5000  # Rows inserted into the staging table per transaction
+CHUNK_SIZE = 64 * 1024  # Bytes read from the attachment at a time
+PROGRESS_INTERVAL = 3  # Seconds between progress message edits
+IMPORT_EXTENSIONS = (".json", ".ndjson", ".json.gz", ".ndjson.gz")  # Everything /export_xp can produce
+MAX_PARTS = 10  # Attachments per import, as many as /export_xp sends per message
+
+INSERT_SQL = f"INSERT OR REPLACE INTO {STAGING_TABLE} (guild_id, user_id, xp, level, last_message) VALUES (?, ?, ?, ?, ?)"
+
 class ImportXP(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.lock = asyncio.Lock()  # One import at a time; they share the staging table
 
-    async def _import_data(self, users_data: dict, lifetime: bool):
-        """Async function to handle database operations in a thread"""
-        def _db_work():
-            try:
-                conn, cur = get_db(lifetime)
-                
-                # Drop and recreate the XP table
-                cur.execute("DROP TABLE IF EXISTS xp")
-                cur.execute("""
-                CREATE TABLE xp (
-                    user_id TEXT PRIMARY KEY,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 0,
-                    last_message INTEGER DEFAULT 0
-                )
-                """)
-                
-                # Batch insert for much better performance
-                insert_data = []
-                for user_id, user_info in users_data.items():
-                    uid = str(user_id)
-                    xp = int(user_info.get("xp", 0))
-                    level = 0
-                    while xp >= xp_for_level(level + 1):
-                        level += 1
-                    insert_data.append((uid, xp, level, 0))
-                
-                # Single executemany call is MUCH faster than individual inserts
-                cur.executemany(
-                    "INSERT INTO xp (user_id, xp, level, last_message) VALUES (?, ?, ?, ?)",
-                    insert_data
-                )
-                
-                conn.commit()
-                conn.close()
-                return len(insert_data)
-            except Exception as e:
-                print(f"Error in _db_work: {e}")
-                raise
-        
-        # Run database work in thread pool
-        count = await asyncio.to_thread(_db_work)
-        return count
-
-    @app_commands.command(name="import_xp", description="Import XP data from JSON (admin only, overwrites DB)")
+    async def _download(self, url: str):
+        """Yield the attachment's bytes a chunk at a time."""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    yield chunk
+
+    async def _insert_batch(self, db, guild_id: int, batch: list):
+        xps = [xp for _, xp in batch]
+        levels = compute_levels(xps)
+        rows = [(guild_id, uid, xp, int(level), 0) for (uid, xp), level in zip(batch, levels)]
+        await db.aexecutemany(INSERT_SQL, rows)
+
+    @staticmethod
+    def _parse_xp(user_id, user_info) -> int:
+        """XP of one exported record, raising ValueError naming the user if it is malformed."""
+        if not isinstance(user_info, dict):
+            raise ValueError(f"user {user_id}: expected an object, got {type(user_info).__name__}")
+        xp = user_info.get("xp", 0)
+        if isinstance(xp, bool):
+            raise ValueError(f"user {user_id}: xp must be a number, got {xp!r}")
+        try:
+            return int(xp)
+        except (TypeError, ValueError):
+            raise ValueError(f"user {user_id}: xp must be a number, got {xp!r}") from None
+
+    def _iter_users(self, url: str, filename: str):
+        """Pick the parser for a file from its extension."""
+        chunks = self._download(url)
+        if filename.endswith(".gz"):
+            chunks = gunzip(chunks)
+            filename = filename[:-3]
+        if filename.endswith(".ndjson"):
+            return iter_ndjson_users(chunks)
+        return iter_users(chunks)
+
+    async def _import_data(self, sources, lifetime: bool, guild_id: int, progress=None) -> int:
+        """Stream users from an export into a guild's rows on the board, replacing them only on success.
+
+        sources is a list of (url, filename) pairs, the parts of a split
+        export, which all load into one staging table. Rows are parsed
+        incrementally and written in IMPORT_BATCH sized batches, and the
+        staging table replaces the guild's rows in a single transaction once
+        every part has loaded. progress(count) is awaited after each batch.
+        """
+        db = get_board(lifetime)
+        await db.run(create_staging)
+        try:
+            count = 0
+            batch = []
+            for url, filename in sources:
+                try:
+                    async for user_id, user_info in self._iter_users(url, filename):
+                        batch.append((str(user_id), self._parse_xp(user_id, user_info)))
+                        if len(batch) >= IMPORT_BATCH:
+                            await self._insert_batch(db, guild_id, batch)
+                            count += len(batch)
+                            batch = []
+                            if progress:
+                                await progress(count)
+                except ValueError as e:
+                    if len(sources) > 1:
+                        raise ValueError(f"{filename}: {e}") from None
+                    raise
+            if batch:
+                await self._insert_batch(db, guild_id, batch)
+                count += len(batch)
+
+            if count == 0:
+                raise ValueError("No user data found in the JSON file.")
+
+            def _swap():
+                with db.transaction() as conn:
+                    swap_in_staging(conn, lifetime, guild_id)
+
+            await accumulator.aexclusive(lifetime, _swap)
+            return count
+        except BaseException:
+            # Leave the live board untouched and discard the partial load
+            await db.aexecute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+            raise
+
+    @app_commands.command(name="import_xp", description="Import XP data from a JSON/NDJSON export (admin only, overwrites DB)")
     @app_commands.choices(
         xp_type=[
             app_commands.Choice(name="Lifetime", value="lifetime"),
             app_commands.Choice(name="Annual", value="annual")
         ]
     )
+    @app_commands.describe(
+        attachment="The export, or the first part of a split export",
+        **{f"part{n}": f"Part {n} of a split export" for n in range(2, MAX_PARTS + 1)}
+    )
     @ModerationBase.is_admin()
     async def import_xp(
         self,
         interaction: discord.Interaction,
         xp_type: app_commands.Choice[str],
-        attachment: discord.Attachment
+        attachment: discord.Attachment,
+        part2: discord.Attachment = None,
+        part3: discord.Attachment = None,
+        part4: discord.Attachment = None,
+        part5: discord.Attachment = None,
+        part6: discord.Attachment = None,
+        part7: discord.Attachment = None,
+        part8: discord.Attachment = None,
+        part9: discord.Attachment = None,
+        part10: discord.Attachment = None
     ):
         try:
             # Defer immediately
             await interaction.response.defer()
 
-            if not ModerationBase.is_admin():
-                await interaction.followup.send("You do not have permission to run this command")
-                return
-             
             print(f"Import started for {xp_type.value}")
-            
+
             lifetime = xp_type.value == "lifetime"
 
-            if not attachment.filename.endswith(".json"):
-                await interaction.followup.send("❌ Please upload a valid `.json` file.")
+            attachments = [
+                part for part in (attachment, part2, part3, part4, part5, part6, part7, part8, part9, part10)
+                if part is not None
+            ]
+            if not all(part.filename.endswith(IMPORT_EXTENSIONS) for part in attachments):
+                await interaction.followup.send("❌ Please upload a `.json`, `.ndjson` or gzipped (`.gz`) export.")
                 return
 
-            # Download and parse JSON file
-            print("Downloading attachment...")
-            file_bytes = await attachment.read()
-            print(f"Downloaded {len(file_bytes)} bytes")
-            
-            try:
-                print("Parsing JSON...")
-                data = json.loads(file_bytes.decode("utf-8"))
-            except json.JSONDecodeError as e:
-                await interaction.followup.send(f"❌ Invalid JSON file format: {str(e)}")
+            if self.lock.locked():
+                await interaction.followup.send("❌ Another import is already running.")
                 return
 
-            users_data = data.get("users", {})
-            
-            if not users_data:
-                await interaction.followup.send("❌ No user data found in the JSON file.")
-                return
-            
-            print(f"Found {len(users_data)} users to import")
-            
-            # Import data asynchronously
-            print("Importing data...")
-            count = await self._import_data(users_data, lifetime)
+            names = ", ".join(f"`{part.filename}`" for part in attachments)
+            status = await interaction.followup.send(f"⏳ Importing {names}...", wait=True)
+            last_report = time.monotonic()
+
+            async def progress(count: int):
+                nonlocal last_report
+                if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await status.edit(content=f"⏳ Importing {names}... {count:,} users so far")
+
+            async with self.lock:
+                try:
+                    sources = [(part.url, part.filename) for part in attachments]
+                    count = await self._import_data(sources, lifetime, interaction.guild_id, progress)
+                except ValueError as e:
+                    await status.edit(content=f"❌ Invalid export file: {str(e)}")
+                    return
             print(f"Import complete: {count} users")
 
-            await interaction.followup.send(
-                f"✅ Imported `{xp_type.value}` XP data from `{attachment.filename}` — {count} users imported (existing data overwritten)."
+            await status.edit(
+                content=f"✅ Imported `{xp_type.value}` XP data from {names} — {count:,} users imported (existing data overwritten)."
             )
-            
+
         except Exception as e:
             print(f"Error in import_xp: {e}")
             import traceback
@@ -125,4 +186,4 @@ class ImportXP(commands.Cog):
                 pass
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(ImportXP(bot))
\ No newline at end of file
+    await bot.add_cog(ImportXP(bot))
@@ -0,0 +1,74 @@
+import codecs
+import json
+import zlib
+import ijson
+
+class ChunkReader:
+    """Async file-like view of an async iterable of byte chunks, as ijson reads it."""
+
+    def __init__(self, chunks):
+        self.chunks = aiter(chunks)
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""  # ijson probes with read(0) to tell bytes from text
+        # An empty chunk would read as the end of the file, so skip them
+        async for chunk in self.chunks:
+            if chunk:
+                return chunk
+        return b""
+
+async def iter_users(chunks):
+    """Yield (user_id, info) pairs from an async iterable of UTF-8 encoded chunks.
+
+    The export is shaped like {"users": {"<id>": {...}, ...}}. ijson parses
+    it incrementally, so only one user's entry is held in memory rather
+    than the whole document. Other top-level keys are skipped.
+    """
+    try:
+        async for user_id, info in ijson.kvitems_async(ChunkReader(chunks), "users", use_float=True):
+            yield user_id, info
+    except ijson.JSONError as e:
+        raise ValueError(f"Malformed JSON: {e}") from None
+
+async def iter_ndjson_users(chunks):
+    """Yield (user_id, info) pairs from NDJSON, one {"user_id": ..., ...} object per line."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            entry = _ndjson_entry(line, line_no)
+            if entry:
+                yield entry
+    entry = _ndjson_entry(pending + decoder.decode(b"", final=True), line_no + 1)
+    if entry:
+        yield entry
+
+def _ndjson_entry(line: str, line_no: int):
+    if not line.strip():
+        return None
+    try:
+        info = json.loads(line)
+        return str(info.pop("user_id")), info
+    except (json.JSONDecodeError, KeyError, AttributeError, TypeError) as e:
+        raise ValueError(f"Malformed NDJSON on line {line_no}: {e}") from None
+
+async def gunzip(chunks):
+    """Decompress an async iterable of gzip-compressed chunks."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        async for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        data = decompressor.flush()
+    except zlib.error as e:
+        raise ValueError(f"Invalid gzip data: {e}") from None
+    if data:
+        yield data
+    if not decompressor.eof:
+        raise ValueError("Unexpected end of gzip data")
@@ -1,48 +1,60 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from discord.ui import View, Button
-from .database import get_db
+from .database import get_leaderboard_rows, count_users, archived_years, archive_table
+from .accumulator import accumulator
+from core.database import run_blocking
+from core.pagination import LeaderboardView
 import math
 
-class LeaderboardView(View):
-    def __init__(self, embed_pages):
-        super().__init__(timeout=60)
-        self.embed_pages = embed_pages
-        self.current_page = 0
-        self.update_button_states()
-
-    async def update_message(self, interaction: discord.Interaction):
-        self.update_button_states()
-        embed = self.embed_pages[self.current_page]
-        await interaction.response.edit_message(embed=embed, view=self)
-
-    def update_button_states(self):
-        self.previous.disabled = self.current_page == 0
-        self.next.disabled = self.current_page == len(self.embed_pages) - 1
-
-    @discord.ui.button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
-    async def previous(self, interaction: discord.Interaction, button: Button):
-        if self.current_page > 0:
-            self.current_page -= 1
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="➡️ Next", style=discord.ButtonStyle.secondary)
-    async def next(self, interaction: discord.Interaction, button: Button):
-        if self.current_page < len(self.embed_pages) - 1:
-            self.current_page += 1
-        await self.update_message(interaction)
-
-    async def on_timeout(self):
-        for child in self.children:
-            if isinstance(child, Button):
-                child.disabled = True
-
-        if hasattr(self, "message") and self.message:
-            try:
-                await self.message.edit(view=self)
-            except discord.NotFound:
-                pass
+PER_PAGE = 10
+FETCH_SIZE = 50  # Rows read per query while filling a page
+
+class LeaderboardPages:
+    """Keyset-paginated pages of one guild's rows on an XP board.
+
+    Rows are read from the database a chunk at a time, ordered by
+    (xp DESC, user_id), and the key where each page starts is remembered so
+    moving to the next page never rescans earlier rows.
+    """
+
+    def __init__(self, guild: discord.Guild, lifetime: bool, show_absent: bool, table: str | None = None):
+        self.guild = guild
+        self.lifetime = lifetime
+        self.show_absent = show_absent
+        self.table = table
+        self.starts = [None]  # page -> (xp, user_id) key the page starts after
+        self.generation = accumulator.generation[lifetime]
+
+    def check_stale(self) -> bool:
+        """Forget page keys if the board was rewritten (restore, reset, import) since they were read."""
+        generation = accumulator.generation[self.lifetime]
+        if generation == self.generation:
+            return False
+        self.generation = generation
+        self.starts = [None]
+        return True
+
+    async def fetch(self, page: int):
+        """Return up to PER_PAGE visible rows for a page and whether another page follows."""
+        after = self.starts[page]
+        rows = []
+        while len(rows) <= PER_PAGE:
+            chunk = await run_blocking(get_leaderboard_rows, self.lifetime, self.guild.id, after, FETCH_SIZE, self.table)
+            for uid, xp, level in chunk:
+                if self.show_absent or self.guild.get_member(int(uid)) is not None:
+                    rows.append((uid, xp, level))
+                    if len(rows) > PER_PAGE:
+                        break
+            if len(chunk) < FETCH_SIZE or len(rows) > PER_PAGE:
+                break
+            after = (chunk[-1][1], chunk[-1][0])
+
+        has_next = len(rows) > PER_PAGE
+        rows = rows[:PER_PAGE]
+        if has_next and len(self.starts) == page + 1:
+            self.starts.append((rows[-1][1], rows[-1][0]))
+        return rows, has_next
 
 
 class Leaderboard(commands.Cog):
@@ -55,7 +67,8 @@ class Leaderboard(commands.Cog):
     )
     @app_commands.describe(
         board_type="Choose which leaderboard to view",
-        show_absent="Include members who are no longer in the server (default: False)"
+        show_absent="Include members who are no longer in the server (default: False)",
+        year="Show a past year's annual leaderboard"
     )
     @app_commands.choices(
         board_type=[
@@ -67,76 +80,86 @@ class Leaderboard(commands.Cog):
         self,
         interaction: discord.Interaction,
         board_type: app_commands.Choice[str] = None,
-        show_absent: bool = False
+        show_absent: bool = False,
+        year: int = None
     ):
         await interaction.response.defer(thinking=True)
-        
+
         board_type_value = board_type.value if board_type else "lifetime"
         board_display_name = board_type.name if board_type else "Lifetime"
 
-        use_lifetime_db = board_type_value == "lifetime"
-        conn, cur = get_db(use_lifetime_db)
-
-        cur.execute("SELECT user_id, xp, level FROM xp ORDER BY xp DESC")
-        all_rows = cur.fetchall()
-        conn.close()
-
-        if not all_rows:
-            return await interaction.followup.send("No leaderboard data yet!", ephemeral=True)
-
-        user_id = str(interaction.user.id)
+        table = None  # The live board's table
+        if year is not None:
+            # Past years are archived from the annual board
+            if year not in await run_blocking(archived_years):
+                return await interaction.followup.send(f"No archived leaderboard for {year}.", ephemeral=True)
+            board_type_value = "annual"
+            board_display_name = f"{year} Annual XP"
+            table = archive_table(year)
 
-        # Filter out absent users UNLESS show_absent is True
-        if not show_absent:
-            all_rows = [
-                row for row in all_rows
-                if interaction.guild.get_member(int(row[0])) is not None
-            ]
+        use_lifetime_db = board_type_value == "lifetime"
+        # Make sure recent XP gains are on disk before ranking
+        await accumulator.aflush()
 
-        if not all_rows:
-            return await interaction.followup.send(
-                "No visible leaderboard entries with the current settings.", ephemeral=True
-            )
+        guild = interaction.guild
+        pages = LeaderboardPages(guild, use_lifetime_db, show_absent, table)
+        color = self.bot.get_cog("EmbedColor").get_user_color(interaction.user)
 
-        per_page = 10
-        total_pages = math.ceil(len(all_rows) / per_page)
-        embeds = []
+        # Every row is visible with show_absent, so the page count is known up front
+        total_pages = None
+        if show_absent:
+            total_pages = math.ceil(await run_blocking(count_users, use_lifetime_db, guild.id, table) / PER_PAGE)
 
-        for page_num in range(total_pages):
-            start_idx = page_num * per_page
-            end_idx = start_idx + per_page
-            page_rows = all_rows[start_idx:end_idx]
+        async def render_page(page_num: int):
+            page_rows, has_next = await pages.fetch(page_num)
+            page_label = f"{page_num + 1}/{total_pages}" if total_pages else f"{page_num + 1}"
 
             embed = discord.Embed(
-                title=f"{board_display_name} Leaderboard (Page {page_num + 1}/{total_pages})",
-                color=self.bot.get_cog("EmbedColor").get_user_color(interaction.user)
+                title=f"{board_display_name} Leaderboard (Page {page_label})",
+                color=color
             )
 
             if page_num == 0 and page_rows:
-                top_member = interaction.guild.get_member(int(page_rows[0][0]))
+                top_member = guild.get_member(int(page_rows[0][0]))
                 if top_member:
                     embed.set_thumbnail(url=top_member.display_avatar.url)
 
             description_lines = []
+            start_idx = page_num * PER_PAGE
             for idx, (uid, xp, level) in enumerate(page_rows, start=start_idx + 1):
-                member = interaction.guild.get_member(int(uid))
+                member = guild.get_member(int(uid))
                 if member:
                     line = f"{idx}. {member.mention} · Level {level} · {xp:,} XP"
-                elif show_absent:
-                    # Only show absent users if show_absent is True
-                    line = f"{idx}. User {uid} · Level {level} · {xp:,} XP"
                 else:
-                    continue
+                    # Only reachable when show_absent is True
+                    line = f"{idx}. User {uid} · Level {level} · {xp:,} XP"
                 description_lines.append(line)
 
             embed.description = "\n".join(description_lines)
-            embeds.append(embed)
+            return embed, has_next
+
+        view = LeaderboardView(render_page, is_stale=pages.check_stale)
+        first_page = await view.get_page(0)
+
+        if not first_page.description:
+            if show_absent:
+                return await interaction.followup.send("No leaderboard data yet!", ephemeral=True)
+            return await interaction.followup.send(
+                "No visible leaderboard entries with the current settings.", ephemeral=True
+            )
 
-        view = LeaderboardView(embeds)
-        await interaction.followup.send(embed=embeds[0], view=view)
+        await interaction.followup.send(embed=first_page, view=view)
 
         view.message = await interaction.original_response()
 
+    @leaderboard.autocomplete("year")
+    async def year_autocomplete(self, interaction: discord.Interaction, current: str):
+        years = await run_blocking(archived_years)
+        return [
+            app_commands.Choice(name=str(y), value=y)
+            for y in years if current in str(y)
+        ][:25]
+
 
 async def setup(bot):
-    await bot.add_cog(Leaderboard(bot))
\ No newline at end of file
+    await bot.add_cog(Leaderboard(bot))
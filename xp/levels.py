@@ -0,0 +1,72 @@
+import bisect
+import math
+from .config import config
+
+INITIAL_LEVELS = 500  # Levels precomputed up front; the table grows on demand
+MAX_LEVEL = 100_000  # Hard cap so a flat curve can't grow the table forever
+
+def curve_xp(level: int, curve: dict) -> int:
+    """Raw XP_CURVE formula for one level."""
+    xp = (level ** 3 * curve["base"]) + (level ** 2 * curve["square"]) + (level * curve["linear"])
+    xp = xp / curve["divisor"]
+    return int(math.floor(xp / 100) * 100)
+
+class LevelCurve:
+    """Precomputed XP thresholds for every level.
+
+    thresholds[level] is the total XP needed to reach that level. The table
+    is kept non-decreasing so xp -> level is a binary search, and it is
+    rebuilt whenever XP_CURVE changes in the config.
+    """
+
+    def __init__(self):
+        self.curve = None
+        self.thresholds = []
+
+    def _table(self) -> list[int]:
+        curve = config.curve
+        if curve is not self.curve:
+            if curve != self.curve:
+                self.thresholds = self._build(curve, INITIAL_LEVELS)
+            self.curve = curve
+        return self.thresholds
+
+    def _build(self, curve: dict, levels: int, thresholds=None) -> list[int]:
+        thresholds = list(thresholds or [])
+        highest = thresholds[-1] if thresholds else 0
+        for level in range(len(thresholds), levels + 1):
+            highest = max(highest, curve_xp(level, curve))
+            thresholds.append(highest)
+        return thresholds
+
+    def _grow(self, thresholds: list[int], levels: int) -> list[int]:
+        levels = min(levels, MAX_LEVEL)
+        if levels < len(thresholds):
+            return thresholds
+        self.thresholds = self._build(self.curve, levels, thresholds)
+        return self.thresholds
+
+    def xp_for_level(self, level: int) -> int:
+        """Total XP needed to reach a level."""
+        thresholds = self._table()
+        if level >= len(thresholds):
+            thresholds = self._grow(thresholds, max(level, len(thresholds) * 2))
+            level = min(level, len(thresholds) - 1)
+        return thresholds[max(0, level)]
+
+    def level_for_xp(self, xp: int) -> int:
+        """Highest level whose threshold is at or below xp."""
+        thresholds = self._table()
+        while xp >= thresholds[-1] and len(thresholds) <= MAX_LEVEL:
+            thresholds = self._grow(thresholds, len(thresholds) * 2)
+        return max(0, bisect.bisect_right(thresholds, xp) - 1)
+
+    def progress(self, xp: int, level: int) -> float:
+        """Fraction of the way from `level` to the next level, clamped to [0, 1]."""
+        current = self.xp_for_level(level)
+        span = self.xp_for_level(level + 1) - current
+        if span <= 0:
+            return 1.0
+        return max(0.0, min(1.0, (xp - current) / span))
+
+level_curve = LevelCurve()
@@ -0,0 +1,46 @@
+from .config import config
+
+class MultiplierResolver:
+    """Effective XP multiplier of each member, cached per guild.
+
+    A member's multiplier is the highest MULTIPLIERS entry among their roles
+    (1 if none match). Results are cached until the member's roles change
+    (on_member_update in XPEvents) or the config is reloaded.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # guild_id -> {member_id: (multiplier, role_id)}
+        config.on_reload(self.clear)
+
+    def resolve(self, member) -> tuple[float, int | None]:
+        """Return (multiplier, id of the role granting it) for a member."""
+        guild = getattr(member, "guild", None)
+        if guild is None:
+            return 1, None  # Not a guild member, so no roles
+
+        members = self.guilds.setdefault(guild.id, {})
+        cached = members.get(member.id)
+        if cached is None:
+            cached = members[member.id] = self._compute(member)
+        return cached
+
+    def _compute(self, member) -> tuple[float, int | None]:
+        multipliers = config.multipliers
+        best, best_role = 1, None
+        for role in member.roles:
+            multiplier = multipliers.get(role.id)
+            if multiplier is not None and multiplier > best:
+                best, best_role = multiplier, role.id
+        return best, best_role
+
+    def invalidate(self, guild_id: int, member_id: int | None = None):
+        """Forget one member's multiplier, or every member's in a guild."""
+        if member_id is None:
+            self.guilds.pop(guild_id, None)
+        else:
+            self.guilds.get(guild_id, {}).pop(member_id, None)
+
+    def clear(self):
+        self.guilds = {}
+
+multiplier_resolver = MultiplierResolver()
@@ -4,8 +4,12 @@ import math
 import traceback
 from discord.ext import commands
 from discord import app_commands
-from .database import get_db
-from .utils import xp_for_level, get_multiplier, load_config
+from core.database import run_blocking
+from .database import get_rank
+from .accumulator import accumulator
+from .multipliers import multiplier_resolver
+from .levels import level_curve
+from .config import config
 
 class Rank(commands.Cog):
     def __init__(self, bot):
@@ -31,39 +35,23 @@ class Rank(commands.Cog):
             board_type_value = board_type.value if board_type else "lifetime"
             lifetime = board_type_value == "lifetime"
 
-            # Load config fresh every time
-            config = load_config()
-            MULTIPLIERS = config["MULTIPLIERS"]
-            COOLDOWN = config["COOLDOWN"]
+            COOLDOWN = config.cooldown
 
-            conn, cur = get_db(lifetime)
+            # Fetch XP data for the requested user (includes writes not yet flushed)
+            entry = await accumulator.aget(interaction.guild_id, str(user.id), lifetime)
 
-            # Fetch XP data for the requested user
-            cur.execute("SELECT xp, level, last_message FROM xp WHERE user_id = ?", (str(user.id),))
-            row = cur.fetchone()
-
-            if not row:
-                conn.close()
+            if not entry:
                 await interaction.response.send_message(f"{user.display_name} has no XP yet.", ephemeral=True)
                 return
 
-            xp, level, last_msg = row
-
-            # Determine the user's leaderboard rank
-            cur.execute("SELECT user_id FROM xp ORDER BY xp DESC")
-            all_users = [r[0] for r in cur.fetchall()]
-            conn.close()
-
-            try:
-                rank_position = all_users.index(str(user.id)) + 1
-            except ValueError:
-                rank_position = None
+            xp, level, last_msg = entry.xp, entry.level, entry.last_message
 
-            total_users = len(all_users)
-            rank_text = f"#{rank_position:,} / {total_users:,}" if rank_position else "Unranked"
+            # Determine the user's rank in this server from the xp index
+            rank_position, total_users = await run_blocking(get_rank, lifetime, interaction.guild_id, xp)
+            rank_text = f"#{rank_position:,} / {total_users:,}"
 
             # XP and progression
-            next_level_xp = xp_for_level(level + 1)
+            next_level_xp = level_curve.xp_for_level(level + 1)
             needed = next_level_xp - xp
 
             # Cooldown
@@ -75,17 +63,13 @@ class Rank(commands.Cog):
 
             # Multiplier text (Lifetime only)
             if lifetime and isinstance(user, discord.Member) and user.guild == interaction.guild:
-                multiplier = get_multiplier(user, apply_multiplier=True)
-                role_name = None
-                for role in user.roles:
-                    if str(role.id) in MULTIPLIERS and MULTIPLIERS[str(role.id)] == multiplier:
-                        role_name = role.mention
-                        break
+                multiplier, role_id = multiplier_resolver.resolve(user)
+                role = user.guild.get_role(role_id) if role_id else None
+                role_name = role.mention if role else None
                 multipliers_text.append(f"{role_name} – {multiplier}x XP" if role_name else "None")
 
             # Progress bar
-            percent = (xp - xp_for_level(level)) / (next_level_xp - xp_for_level(level))
-            percent = max(0, min(1, percent))
+            percent = level_curve.progress(xp, level)
             bar_length = 20
             filled = int(percent * bar_length)
             bar = "█" * filled + "░" * (bar_length - filled)
@@ -0,0 +1,56 @@
+import bisect
+import sqlite3
+from .levels import level_curve
+
+try:
+    import numpy as np
+except ImportError:  # Fall back to bisect if NumPy isn't installed
+    np = None
+
+UPDATE_SQL = "UPDATE {table} SET level = ? WHERE guild_id = ? AND user_id = ?"
+
+def compute_levels(xps):
+    """Levels for a sequence of XP totals, as a NumPy array when available.
+
+    Every value is looked up against the level threshold table at once with
+    searchsorted, which matches LevelCurve.level_for_xp for each value.
+    """
+    if len(xps) == 0:
+        return []
+    level_curve.level_for_xp(max(xps))  # Grow the table to cover the highest XP
+    thresholds = level_curve.thresholds
+
+    if np is None:
+        return [max(0, bisect.bisect_right(thresholds, xp) - 1) for xp in xps]
+
+    table = np.asarray(thresholds, dtype=np.int64)
+    levels = np.searchsorted(table, np.asarray(xps, dtype=np.int64), side="right") - 1
+    return np.maximum(levels, 0)
+
+def recalc_levels(conn: sqlite3.Connection, table: str, guild_id: int, user_id: str | None = None) -> tuple[int, int]:
+    """Recompute a guild's stored levels on a board table from XP, writing only rows whose level changed.
+
+    Runs inside the caller's transaction. Returns (changed, total) row counts.
+    """
+    select = f"SELECT user_id, COALESCE(xp, 0), COALESCE(level, -1) FROM {table} WHERE guild_id = ?"
+    if user_id:
+        rows = conn.execute(select + " AND user_id = ?", (guild_id, user_id)).fetchall()
+    else:
+        rows = conn.execute(select, (guild_id,)).fetchall()
+    if not rows:
+        return 0, 0
+
+    user_ids, xps, levels = zip(*rows)
+    new_levels = compute_levels(xps)
+
+    if np is None:
+        updates = [
+            (new, guild_id, uid) for uid, old, new in zip(user_ids, levels, new_levels) if new != old
+        ]
+    else:
+        changed = np.flatnonzero(new_levels != np.asarray(levels, dtype=np.int64))
+        updates = [(int(new_levels[i]), guild_id, user_ids[i]) for i in changed]
+
+    if updates:
+        conn.executemany(UPDATE_SQL.format(table=table), updates)
+    return len(updates), len(rows)
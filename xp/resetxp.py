@@ -1,10 +1,11 @@
 import discord
-from discord.ext import commands
+import traceback
+from datetime import datetime
+from discord.ext import commands, tasks
 from discord import app_commands
-import sqlite3
-import os
 from moderation.loader import ModerationBase
-from xp.add_xp import get_db
+from xp.database import get_board, board_table, get_board_year, rollover_annual
+from xp.accumulator import accumulator
 
 class ResetXPView(discord.ui.View):
     def __init__(self, author: discord.User, db_label: str, on_confirm):
@@ -59,10 +60,27 @@ class FinalResetXPView(discord.ui.View):
 
 
 class ResetAnnual(commands.Cog):
-    """Admin slash command to reset XP databases."""
+    """Admin slash command to reset XP databases, and the automatic annual rollover."""
 
     def __init__(self, bot):
         self.bot = bot
+        self.rollover_task.start()
+
+    def cog_unload(self):
+        self.rollover_task.cancel()
+
+    @tasks.loop(hours=1)
+    async def rollover_task(self):
+        """Archive the annual board once the year it was counting has ended"""
+        try:
+            year = datetime.now().year
+            board_year = await get_board(lifetime=False).run(get_board_year, year)
+            if board_year < year:
+                count = await accumulator.aexclusive(False, rollover_annual, board_year, year)
+                print(f"Annual XP rollover: archived {count} users from {board_year}, now counting {year}")
+        except Exception as e:
+            print(f"Error in annual XP rollover: {e}")
+            traceback.print_exc()
 
     @app_commands.command(name="resetxp", description="Reset either the annual or lifetime XP leaderboard.")
     @app_commands.describe(db_type="Choose which database to reset: 'annual' or 'lifetime'.")
@@ -77,10 +95,11 @@ class ResetAnnual(commands.Cog):
 
         async def do_reset(inter: discord.Interaction):
             lifetime = False if db_type == "annual" else True
-            conn, cur = get_db(lifetime)
-            cur.execute("DELETE FROM xp")
-            conn.commit()
-            conn.close()
+
+            await accumulator.aexclusive(
+                lifetime, get_board(lifetime).execute,
+                f"DELETE FROM {board_table(lifetime)} WHERE guild_id = ?", (inter.guild_id,)
+            )
             await inter.response.send_message(f"✅ {db_label.capitalize()} XP leaderboard has been reset.", ephemeral=False)
 
         view = ResetXPView(interaction.user, db_label, do_reset)
@@ -3,8 +3,14 @@ from discord import app_commands
 from discord.ext import commands
 from discord.ui import View, Button
 import os
-import shutil
+import asyncio
+from datetime import datetime
 from moderation.loader import ModerationBase
+from xp.accumulator import accumulator
+from xp.database import restore_board
+from xp.snapshots import build_restore, diffs_between, parse_backup_name, validate_backup, is_board_backup
+
+UNTIL_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M")  # Autocomplete offers the first
 
 class RestoreXP(commands.Cog):
     def __init__(self, bot):
@@ -12,25 +18,37 @@ class RestoreXP(commands.Cog):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.backup_dir = os.path.join(self.base_dir, "backups")
 
-    @app_commands.command(name="restorebackup", description="Restore a lifetime or annual XP database from backup")
+    @app_commands.command(name="restorebackup", description="Restore the lifetime or annual XP board from backup")
     @app_commands.describe(
-        db_type="Choose which database to restore",
-        filename="Select the backup file to restore"
+        db_type="Choose which board to restore",
+        filename="Select the full backup file to restore",
+        until="Replay differential backups up to this time (YYYY-MM-DD HH:MM)"
     )
     @ModerationBase.is_admin()
-    async def restorebackup(self, interaction: discord.Interaction, db_type: str, filename: str):
+    async def restorebackup(self, interaction: discord.Interaction, db_type: str, filename: str, until: str = None):
         await interaction.response.defer(ephemeral=False)
 
         # Validate db_type
         if db_type not in ["lifetime", "annual"]:
             return await interaction.followup.send("❌ Invalid database type. Choose either `lifetime` or `annual`.")
+        lifetime = db_type == "lifetime"
 
-        db_path = os.path.join(self.base_dir, f"{db_type}.db")
         backup_path = os.path.join(self.backup_dir, filename)
 
         # Check if the backup file exists
         if not os.path.exists(backup_path):
             return await interaction.followup.send(f"❌ Backup file `{filename}` not found in backups folder.")
+        if not is_board_backup(filename, lifetime):
+            return await interaction.followup.send(f"❌ `{filename}` is not a full backup of the {db_type} board.")
+
+        until_time = None
+        if until:
+            until_time = self.parse_until(until)
+            if until_time is None:
+                return await interaction.followup.send("❌ Invalid time. Use the format `YYYY-MM-DD HH:MM`.")
+            if until_time < parse_backup_name(filename)[1]:
+                return await interaction.followup.send("❌ The time must be after the backup was taken.")
+        target = f"`{filename}`" + (f" as of {until}" if until else "")
 
         view = View(timeout=30)
         confirmed = {"value": False}
@@ -40,7 +58,7 @@ class RestoreXP(commands.Cog):
                 await btn_inter.response.send_message("You can’t confirm this action.", ephemeral=True)
                 return
             confirmed["value"] = True
-            await btn_inter.response.edit_message(content=f"✅ Confirmed restore of `{filename}` to `{db_type}.db`.", view=None)
+            await btn_inter.response.edit_message(content=f"✅ Confirmed restore of {target} to the {db_type} board.", view=None)
             view.stop()
 
         async def no_callback(btn_inter: discord.Interaction):
@@ -59,8 +77,8 @@ class RestoreXP(commands.Cog):
         view.add_item(no_button)
 
         await interaction.followup.send(
-            f"⚠️ Are you sure you want to **restore** `{db_type}.db` from `{filename}`?\n"
-            f"This will **overwrite the current database** and cannot be undone.",
+            f"⚠️ Are you sure you want to **restore** the {db_type} board from {target}?\n"
+            f"This will **overwrite the current board** and cannot be undone.",
             view=view
         )
 
@@ -69,12 +87,31 @@ class RestoreXP(commands.Cog):
             return  # Cancelled or timed out
 
         # --- Perform Restore ---
+        # Rebuild and check the backup beforehand so the board is only held for the copy
+        restore_path = os.path.join(self.backup_dir, f".restore_{db_type}.db")
         try:
-            shutil.copy2(backup_path, db_path)
+            applied = await asyncio.to_thread(build_restore, self.backup_dir, filename, restore_path, lifetime, until_time)
+            table = await asyncio.to_thread(validate_backup, restore_path, lifetime, interaction.guild_id)
+            # Copied into the live connection with XP flushing held off; cached XP is
+            # dropped afterwards and open leaderboards re-read the board
+            await accumulator.aexclusive(lifetime, restore_board, lifetime, interaction.guild_id, restore_path, table)
         except Exception as e:
             return await interaction.followup.send(f"❌ Restore failed: `{e}`")
-
-        await interaction.followup.send(f"✅ `{db_type}.db` successfully restored from `{filename}`")
+        finally:
+            if os.path.exists(restore_path):
+                os.remove(restore_path)
+
+        detail = f" ({applied} differential backup(s) applied)" if until else ""
+        await interaction.followup.send(f"✅ The {db_type} board was successfully restored from {target}{detail}")
+
+    @staticmethod
+    def parse_until(value: str):
+        for fmt in UNTIL_FORMATS:
+            try:
+                return datetime.strptime(value.strip(), fmt)
+            except ValueError:
+                continue
+        return None
 
     @restorebackup.autocomplete("db_type")
     async def db_type_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -92,7 +129,7 @@ class RestoreXP(commands.Cog):
 
         files = [
             f for f in os.listdir(self.backup_dir)
-            if f.startswith(db_type) and f.endswith(".db")
+            if is_board_backup(f, db_type == "lifetime")
         ]
         files.sort(reverse=True)  # Newest first
 
@@ -101,5 +138,19 @@ class RestoreXP(commands.Cog):
             for f in files if current.lower() in f.lower()
         ][:25]  # Discord's limit
 
+    @restorebackup.autocomplete("until")
+    async def until_autocomplete(self, interaction: discord.Interaction, current: str):
+        db_type = getattr(interaction.namespace, "db_type", None)
+        parsed = parse_backup_name(getattr(interaction.namespace, "filename", None) or "")
+        if not db_type or parsed is None:
+            return []
+
+        times = [stamp.strftime(UNTIL_FORMATS[0]) for stamp, _ in diffs_between(self.backup_dir, db_type, parsed[1])]
+        times.reverse()  # Newest first
+        return [
+            app_commands.Choice(name=t, value=t)
+            for t in times if current in t
+        ][:25]
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(RestoreXP(bot))
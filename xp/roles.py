@@ -0,0 +1,102 @@
+import asyncio
+import traceback
+import discord
+from .config import config
+
+def missing_reward_roles(member: discord.Member, level: int) -> list[discord.Role]:
+    """Reward roles a member has earned at `level` but doesn't have yet.
+
+    Roles at or above the bot's top role are skipped, since assigning them
+    would only fail with Forbidden.
+    """
+    guild = member.guild
+    have = {role.id for role in member.roles}
+    top_role = guild.me.top_role
+    missing = []
+    for lvl, role_id in config.role_rewards.items():
+        if level >= lvl and role_id not in have:
+            role = guild.get_role(role_id)
+            if role and role < top_role:
+                missing.append(role)
+    return missing
+
+async def apply_rewards(member: discord.Member, level: int) -> list[discord.Role]:
+    """Give a member every reward role they are missing in one REST call."""
+    missing = missing_reward_roles(member, level)
+    if missing:
+        # atomic=False sends a single member edit with the full role list,
+        # instead of one add-role request per role
+        await member.add_roles(*missing, reason=f"XP level {level} reward", atomic=False)
+    return missing
+
+class RoleRewardScheduler:
+    """Applies level reward roles in the background, one member at a time.
+
+    Level-ups only record the member's newest level. A single worker task then
+    diffs the rewards they have earned against member.roles and adds what is
+    missing in one edit, so repeated level-ups before the worker gets to a
+    member collapse into one request. Working through members one at a time
+    keeps us inside discord.py's per-route rate-limit buckets instead of
+    bursting requests and queueing on 429s.
+
+    Every reward grant goes through here, so two edits of the same member's
+    roles never race each other.
+    """
+
+    def __init__(self):
+        self.pending = {}  # (guild_id, member_id) -> (member, level, future)
+        self.queue = asyncio.Queue()
+        self.worker = None
+
+    def schedule(self, member: discord.Member, level: int) -> asyncio.Future:
+        """Queue a member's rewards for `level`.
+
+        Returns a future for the roles added, or None if the edit failed
+        (the error is logged). It is cancelled if the scheduler is stopped
+        first. Callers may ignore it.
+        """
+        key = (member.guild.id, member.id)
+        queued = self.pending.get(key)
+        if queued is not None:
+            future = queued[2]
+            self.pending[key] = (member, max(level, queued[1]), future)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = (member, level, future)
+            self.queue.put_nowait(key)
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+        return future
+
+    async def _run(self):
+        while True:
+            key = await self.queue.get()
+            member, level, future = self.pending.pop(key)
+            # Prefer the cached member, whose roles reflect any updates since scheduling
+            member = member.guild.get_member(member.id) or member
+            added = None
+            try:
+                added = await apply_rewards(member, level)
+            except asyncio.CancelledError:
+                future.cancel()  # Stopped mid-edit; the member is no longer in pending for stop() to cancel
+                raise
+            except discord.Forbidden:
+                print(f"Cannot assign reward roles to {member} - missing permissions")
+            except Exception as e:
+                print(f"Failed to apply reward roles to {member}: {e}")
+                traceback.print_exc()
+            if not future.done():
+                future.set_result(added)
+
+    def stop(self):
+        """Stop the worker, cancelling the futures of members it hadn't finished."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        for _, _, future in self.pending.values():
+            future.cancel()
+        # Start over empty, so schedule() after a reload doesn't hand out a cancelled future
+        self.pending = {}
+        self.queue = asyncio.Queue()
+
+role_scheduler = RoleRewardScheduler()
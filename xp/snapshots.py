@@ -0,0 +1,253 @@
+import os
+import json
+import gzip
+import shutil
+import sqlite3
+from datetime import datetime
+from .database import board_name, board_table, has_guild_key, add_guild_key, LEGACY_GUILD_ID
+
+BACKUP_PAGES = 1024  # Pages copied per backup step, so the source is only read-locked briefly
+KEEP_DAILY = 7  # Most recent days to keep a backup for
+KEEP_WEEKLY = 8  # Most recent ISO weeks to keep a backup for, beyond the daily ones
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+DIFF_EXT = ".diff.ndjson.gz"
+FULL_BACKUP_NAME = "xp"  # Full backups are of xp.db, holding both boards
+REQUIRED_COLUMNS = {"guild_id", "user_id", "xp", "level", "last_message"}
+
+def backup_database(src_path: str, dest_path: str):
+    """Copy a live database to dest_path with SQLite's online backup API.
+
+    Uses its own connection, so it should run in a worker thread. The copy
+    is a consistent snapshot even while the bot keeps writing, and is
+    checked with quick_check before being accepted.
+    """
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.backup(dest, pages=BACKUP_PAGES)
+        dest.execute("PRAGMA journal_mode=DELETE")  # Self-contained file, no -wal alongside it
+        result = dest.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"Backup failed integrity check: {result}")
+    finally:
+        dest.close()
+        src.close()
+
+def validate_backup(path: str, lifetime: bool, guild_id: int) -> str:
+    """Check path is an intact database with a guild's rows on a board, and return the board's table.
+
+    Raises ValueError otherwise, so a backup of another server can't wipe this one's board.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise ValueError(f"Backup failed integrity check: {result}")
+        table = source_table(conn, lifetime)
+        if table is None:
+            raise ValueError(f"Backup has no {board_name(lifetime)} board")
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        missing = REQUIRED_COLUMNS - columns
+        if missing:
+            raise ValueError(f"Backup {table} table is missing columns: {', '.join(sorted(missing))}")
+        if not conn.execute(f"SELECT 1 FROM {table} WHERE guild_id = ? LIMIT 1", (guild_id,)).fetchone():
+            raise ValueError(f"Backup has no {board_name(lifetime)} XP for this server")
+        return table
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Backup is not a valid database: {e}") from None
+    finally:
+        conn.close()
+
+def compress_file(path: str) -> str:
+    """Gzip a file next to itself, remove the original and return the new path."""
+    gz_path = path + ".gz"
+    with open(path, "rb") as src, gzip.open(gz_path, "wb") as dest:
+        shutil.copyfileobj(src, dest)
+    os.remove(path)
+    return gz_path
+
+def decompress_file(gz_path: str, dest_path: str):
+    with gzip.open(gz_path, "rb") as src, open(dest_path, "wb") as dest:
+        shutil.copyfileobj(src, dest)
+
+def create_snapshot(src_path: str, backup_dir: str, name: str, now: datetime) -> str:
+    """Write a compressed backup of src_path as <name>_<timestamp>.db.gz and return its path."""
+    dest_path = os.path.join(backup_dir, f"{name}_{now.strftime(TIMESTAMP_FORMAT)}.db")
+    try:
+        backup_database(src_path, dest_path)
+        return compress_file(dest_path)
+    finally:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+
+def write_diff(conn: sqlite3.Connection, backup_dir: str, lifetime: bool, now: datetime) -> tuple[str | None, int]:
+    """Write a board's rows changed since its last diff to <board>_<timestamp>.diff.ndjson.gz.
+
+    Runs inside the caller's transaction on the boards' connection, so the
+    change log is only cleared if the file was written. Each line holds a
+    user's current row in a guild, or {"guild_id": ..., "user_id": ...,
+    "deleted": true} if it is gone.
+    Returns (path, rows), with no file written when nothing changed.
+    """
+    name = board_name(lifetime)
+    rows = conn.execute(
+        f"""
+        SELECT c.guild_id, c.user_id, x.user_id IS NULL, x.xp, x.level, x.last_message
+        FROM xp_changes c LEFT JOIN {board_table(lifetime)} x ON x.guild_id = c.guild_id AND x.user_id = c.user_id
+        WHERE c.board = ?
+        """,
+        (name,)
+    ).fetchall()
+    if not rows:
+        return None, 0
+
+    path = os.path.join(backup_dir, f"{name}_{now.strftime(TIMESTAMP_FORMAT)}{DIFF_EXT}")
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for guild_id, user_id, deleted, xp, level, last_message in rows:
+            if deleted:
+                entry = {"guild_id": guild_id, "user_id": user_id, "deleted": True}
+            else:
+                entry = {"guild_id": guild_id, "user_id": user_id, "xp": xp, "level": level, "last_message": last_message}
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, path)
+    conn.execute("DELETE FROM xp_changes WHERE board = ?", (name,))
+    return path, len(rows)
+
+def apply_diff(conn: sqlite3.Connection, path: str, table: str) -> int:
+    """Replay a diff file onto a board table of a restored database. Returns the rows applied.
+
+    Lines written before boards were per guild belong to LEGACY_GUILD_ID.
+    """
+    count = 0
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            guild_id = entry.get("guild_id", LEGACY_GUILD_ID)
+            if entry.get("deleted"):
+                conn.execute(f"DELETE FROM {table} WHERE guild_id = ? AND user_id = ?", (guild_id, entry["user_id"]))
+            else:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {table} (guild_id, user_id, xp, level, last_message) VALUES (?, ?, ?, ?, ?)",
+                    (guild_id, entry["user_id"], entry["xp"], entry["level"], entry["last_message"])
+                )
+            count += 1
+    return count
+
+def diffs_between(backup_dir: str, name: str, after: datetime, until: datetime | None = None) -> list[tuple[datetime, str]]:
+    """(timestamp, filename) of every diff of `name` taken after `after` and up to `until`, oldest first."""
+    diffs = []
+    for filename in os.listdir(backup_dir):
+        parsed = parse_backup_name(filename)
+        if parsed and parsed[2] and parsed[0] == name and parsed[1] > after and (until is None or parsed[1] <= until):
+            diffs.append((parsed[1], filename))
+    diffs.sort()
+    return diffs
+
+def source_table(conn: sqlite3.Connection, lifetime: bool) -> str | None:
+    """Table holding a board in a backup: its xp.db table, or xp in an older one-board file."""
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in (board_table(lifetime), "xp"):
+        if table in tables:
+            return table
+    return None
+
+def is_board_backup(filename: str, lifetime: bool) -> bool:
+    """Whether a full backup file holds a board: any xp.db backup, or that board's older file."""
+    parsed = parse_backup_name(filename)
+    return parsed is not None and not parsed[2] and parsed[0] in (FULL_BACKUP_NAME, board_name(lifetime))
+
+def build_restore(backup_dir: str, base: str, dest_path: str, lifetime: bool, until: datetime | None = None) -> int:
+    """Rebuild a database at dest_path from a full backup plus a board's later diffs.
+
+    Diffs are replayed up to `until` (none if it is None), giving the board
+    as of that time. A board from before per-guild keys is keyed first,
+    with its rows given to LEGACY_GUILD_ID. Returns the number of diffs
+    applied.
+    """
+    base_path = os.path.join(backup_dir, base)
+    if base.endswith(".gz"):
+        decompress_file(base_path, dest_path)
+    else:
+        shutil.copyfile(base_path, dest_path)
+
+    diffs = []
+    if until is not None:
+        if not is_board_backup(base, lifetime):
+            raise ValueError(f"{base} is not a full backup of the {board_name(lifetime)} board")
+        taken = parse_backup_name(base)[1]
+        diffs = diffs_between(backup_dir, board_name(lifetime), taken, until)
+    conn = sqlite3.connect(dest_path)
+    try:
+        table = source_table(conn, lifetime)
+        if table is None:
+            raise ValueError(f"{base} has no {board_name(lifetime)} board")
+        if not has_guild_key(conn, table):
+            conn.execute("BEGIN")  # sqlite3 doesn't open a transaction for DDL by itself
+            add_guild_key(conn, table)
+        for _, filename in diffs:
+            apply_diff(conn, os.path.join(backup_dir, filename), table)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(diffs)
+
+def parse_backup_name(filename: str):
+    """Return (name, timestamp, is_diff) for a backup file, or None if it isn't one."""
+    for ext in (DIFF_EXT, ".db.gz", ".db"):
+        if filename.endswith(ext):
+            stem = filename[:-len(ext)]
+            break
+    else:
+        return None
+    name, _, stamp = stem.partition("_")
+    try:
+        return name, datetime.strptime(stamp, TIMESTAMP_FORMAT), ext == DIFF_EXT
+    except ValueError:
+        return None
+
+def apply_retention(backup_dir: str, name: str, diff_names=None, keep_daily: int = KEEP_DAILY, keep_weekly: int = KEEP_WEEKLY) -> list[str]:
+    """Delete backups of `name` not needed to keep the newest one of each recent day and week.
+
+    The newest full backup from each of the last keep_daily days that have
+    one is kept, as is the newest from each of the last keep_weekly ISO
+    weeks. Diffs named in diff_names (default: just `name`) are kept back
+    to the oldest daily backup, so any point in that window can be
+    restored. Returns the removed filenames.
+    """
+    diff_names = (name,) if diff_names is None else tuple(diff_names)
+    backups, diffs = [], []
+    for filename in os.listdir(backup_dir):
+        parsed = parse_backup_name(filename)
+        if parsed and parsed[2] and parsed[0] in diff_names:
+            diffs.append((parsed[1], filename))
+        elif parsed and not parsed[2] and parsed[0] == name:
+            backups.append((parsed[1], filename))
+    backups.sort(reverse=True)  # Newest first
+
+    keep = set()
+    days, weeks = set(), set()
+    for stamp, filename in backups:
+        day = stamp.date()
+        week = stamp.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep.add(filename)
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            keep.add(filename)
+
+    # Diffs only replay onto a full backup taken before them
+    oldest_daily = min((stamp for stamp, filename in backups if filename in keep and stamp.date() in days), default=None)
+    for stamp, filename in diffs:
+        if oldest_daily is not None and stamp >= oldest_daily:
+            keep.add(filename)
+
+    removed = []
+    for _, filename in backups + diffs:
+        if filename not in keep:
+            os.remove(os.path.join(backup_dir, filename))
+            removed.append(filename)
+    return removed
@@ -2,52 +2,54 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from moderation.loader import ModerationBase, ADMIN_ROLE_ID
-from .database import get_db
-from .utils import load_config, xp_for_level
-from discord.utils import get
+from .database import get_board, board_table
+from .accumulator import accumulator
+from .recalc import recalc_levels
+from .roles import missing_reward_roles, role_scheduler
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
 import traceback
 
+PROGRESS_INTERVAL = 5  # Seconds between status message edits
+
 class XPSync(commands.Cog):
     """Sync XP role rewards for users."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.tasks = set()  # Running /sync_all and /recalc jobs, kept so they aren't garbage collected
 
-    async def sync_roles_for_user(self, member: discord.Member) -> tuple[int, list[str]]:
-        """Sync roles for a member based on their lifetime XP level."""
-        config = load_config()
-        ROLE_REWARDS = {int(k): int(v) for k, v in config["ROLE_REWARDS"].items()}
+    def start_task(self, coro):
+        task = self.bot.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
 
-        conn, cur = get_db(lifetime=True)
-        cur.execute("SELECT level FROM xp WHERE user_id = ?", (str(member.id),))
-        row = cur.fetchone()
-        conn.close()
+    async def sync_roles_for_user(self, member: discord.Member) -> tuple[int, list[str] | None]:
+        """Sync roles for a member based on their lifetime XP level in the member's guild.
 
-        if not row:
+        Returns the level and the names of the roles added, or None for the
+        roles if they couldn't be updated.
+        """
+        entry = await accumulator.aget(member.guild.id, str(member.id), lifetime=True)
+        if not entry:
             return (0, [])
 
-        level = row[0]
-        roles_added = []
-
-        for lvl, role_id in ROLE_REWARDS.items():
-            if level >= lvl:
-                role = get(member.guild.roles, id=role_id)
-                if role and role not in member.roles:
-                    # Check bot hierarchy
-                    if member.guild.me.top_role <= role:
-                        continue
-                    try:
-                        await member.add_roles(role)
-                        roles_added.append(role.name)
-                    except discord.Forbidden:
-                        print(f"Cannot assign {role.name} to {member} - missing permissions")
-                    except discord.HTTPException as e:
-                        print(f"HTTP error assigning {role.name} to {member}: {e}")
-
-        return (level, roles_added)
+        level = entry.level
+        # All missing reward roles in a single member edit, queued with level-up grants;
+        # None means the edit failed, which the scheduler has logged
+        future = role_scheduler.schedule(member, level)
+        try:
+            # Shielded, so a cancelled future means the scheduler stopped rather than this task
+            added = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            added = None  # The XP cog reloaded before the scheduler reached this member
+        if added is None:
+            return (level, None)
+
+        return (level, [role.name for role in added])
 
     @app_commands.command(name="sync", description="Sync your XP role rewards.")
     @app_commands.describe(user="[Admin only] The user to sync roles for.")
@@ -83,6 +85,8 @@ class XPSync(commands.Cog):
             level, roles_added = await self.sync_roles_for_user(target_member)
             if level == 0:
                 await interaction.followup.send(f"{target_member.mention} has no lifetime XP recorded.")
+            elif roles_added is None:
+                await interaction.followup.send(f"❌ Couldn't update roles for {target_member.mention}, please try again.")
             elif roles_added:
                 await interaction.followup.send(
                     f"Synced roles for {target_member.mention} (Level {level})\n"
@@ -104,36 +108,85 @@ class XPSync(commands.Cog):
                 except:
                     print("Could not send error message to user")
 
-    def _recalc_worker(self, lifetime: bool, user_id: str = None) -> int:
-        """Worker function to recalc levels in executor."""
-        conn, cur = get_db(lifetime)
-        total_updated = 0
-
-        if user_id:
-            cur.execute("SELECT xp FROM xp WHERE user_id = ?", (user_id,))
-            row = cur.fetchone()
-            if row:
-                xp = row[0]
-                new_level = 0
-                while xp >= xp_for_level(new_level + 1):
-                    new_level += 1
-                cur.execute("UPDATE xp SET level = ? WHERE user_id = ?", (new_level, user_id))
-                total_updated += 1
-        else:
-            cur.execute("SELECT user_id, xp FROM xp")
-            rows = cur.fetchall()
-            updates = []
-            for uid, xp in rows:
-                new_level = 0
-                while xp >= xp_for_level(new_level + 1):
-                    new_level += 1
-                updates.append((new_level, uid))
-                total_updated += 1
-            cur.executemany("UPDATE xp SET level = ? WHERE user_id = ?", updates)
-
-        conn.commit()
-        conn.close()
-        return total_updated
+    async def _apply_all(self, pending: list, progress: dict):
+        """Queue each (member, level) pair on the role scheduler and count the results as they finish.
+
+        Members the scheduler was stopped before reaching count as failed.
+        """
+        futures = {role_scheduler.schedule(member, level) for member, level in pending}
+        while futures:
+            # wait() doesn't raise for cancelled futures, only if this task is cancelled
+            done, futures = await asyncio.wait(futures, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                added = None if future.cancelled() else future.result()
+                if added is None:
+                    progress["failed"] += 1
+                elif added:
+                    progress["updated"] += 1
+                    progress["roles"] += len(added)
+                progress["done"] += 1
+
+    @app_commands.command(name="sync_all", description="[Admin] Sync XP role rewards for every member.")
+    @ModerationBase.is_admin()
+    async def sync_all(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        await interaction.response.send_message("🔄 Syncing role rewards for all members...", ephemeral=True)
+        # Interaction tokens expire after 15 minutes, so report progress on a regular message
+        status = await interaction.channel.send("🔄 Reading levels...")
+
+        async def process():
+            try:
+                start = time.perf_counter()
+                if not guild.chunked:
+                    await guild.chunk()
+
+                await accumulator.aflush()
+                rows = await get_board(True).afetchall(
+                    f"SELECT user_id, level FROM {board_table(True)} WHERE guild_id = ? AND level > 0", (guild.id,)
+                )
+                levels = {int(uid): level for uid, level in rows}
+
+                # Diff every cached member in memory; only members missing roles need a request
+                pending = []
+                for member in guild.members:
+                    level = levels.get(member.id)
+                    if level and not member.bot:
+                        if missing_reward_roles(member, level):
+                            pending.append((member, level))
+
+                progress = {"done": 0, "updated": 0, "roles": 0, "failed": 0}
+                total = len(pending)
+
+                async def report():
+                    while True:
+                        await asyncio.sleep(PROGRESS_INTERVAL)
+                        await status.edit(content=f"🔄 Syncing role rewards: {progress['done']:,}/{total:,} members")
+
+                reporter = asyncio.create_task(report())
+                try:
+                    await self._apply_all(pending, progress)
+                finally:
+                    reporter.cancel()
+
+                elapsed = time.perf_counter() - start
+                summary = (
+                    f"✅ Role sync complete in {elapsed:.1f}s: checked {len(guild.members):,} members, "
+                    f"added {progress['roles']:,} roles to {progress['updated']:,} members"
+                )
+                if progress["failed"]:
+                    summary += f" ({progress['failed']:,} failed)"
+                await status.edit(content=summary)
+            except Exception as e:
+                print(f"Error in sync_all background task: {e}")
+                traceback.print_exc()
+                await status.edit(content=f"❌ Error syncing roles: {e}")
+
+        self.start_task(process())
+
+    def _recalc_worker(self, lifetime: bool, guild_id: int, user_id: str = None) -> tuple[int, int]:
+        """Worker function to recalc a guild's levels on the database thread."""
+        with get_board(lifetime).transaction() as conn:
+            return recalc_levels(conn, board_table(lifetime), guild_id, user_id)
 
     @app_commands.command(name="recalc", description="[Admin] Recalculate levels based on XP.")
     @app_commands.describe(
@@ -166,34 +219,39 @@ class XPSync(commands.Cog):
 
             async def process():
                 try:
-                    total_updated = 0
+                    total_changed = total_rows = 0
                     for lifetime in boards:
                         board_name = "Lifetime" if lifetime else "Annual"
 
                         if not user:
                             await interaction.followup.send(f"⏳ Processing {board_name} database...")
 
-                        count = await asyncio.get_event_loop().run_in_executor(
-                            self.executor, self._recalc_worker, lifetime, user_id
+                        start = time.perf_counter()
+                        changed, rows = await accumulator.aexclusive(
+                            lifetime, self._recalc_worker, lifetime, interaction.guild_id, user_id
                         )
-                        total_updated += count
+                        elapsed = time.perf_counter() - start
+                        total_changed += changed
+                        total_rows += rows
 
                         if not user:
-                            await interaction.followup.send(f"✅ {board_name} complete: {count} entries updated")
+                            await interaction.followup.send(
+                                f"✅ {board_name} complete: {changed:,} of {rows:,} levels changed in {elapsed:.2f}s"
+                            )
 
                     board_text = "Lifetime and Annual" if board_value == "both" else board_value.title()
                     if user:
                         await interaction.followup.send(f"✅ Recalculated {board_text} level for {user.mention}")
                     else:
                         await interaction.followup.send(
-                            f"🎉 All done! Recalculated {board_text} levels for {total_updated} entries."
+                            f"🎉 All done! Recalculated {board_text} levels for {total_rows:,} entries ({total_changed:,} changed)."
                         )
                 except Exception as e:
                     print(f"Error in recalc background task: {e}")
                     traceback.print_exc()
                     await interaction.followup.send(f"❌ Error during recalculation: {str(e)}")
 
-            self.bot.loop.create_task(process())
+            self.start_task(process())
         except Exception as e:
             print(f"Error in recalc command: {e}")
             traceback.print_exc()
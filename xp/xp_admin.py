@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from moderation.loader import ModerationBase
-from xp.add_xp import get_db
+from xp.accumulator import accumulator
+from xp.config import config
 import time
 
 class XPAdmin(commands.Cog):
@@ -15,6 +16,14 @@ class XPAdmin(commands.Cog):
         """Return False if the arg is 'annual', True otherwise."""
         return False if arg and arg.lower() == "annual" else True
 
+    async def get_entry(self, guild_id: int, user: discord.User, lifetime: bool):
+        """Return the cached XP entry for a user in a guild, creating one if they have no XP yet."""
+        entry = await accumulator.aget(guild_id, str(user.id), lifetime)
+        if entry is None:
+            entry = await accumulator.aget(guild_id, str(user.id), lifetime, create=True)
+            entry.last_message = int(time.time())
+        return entry
+
     @app_commands.command(name="xp_set", description="Set a user's XP directly.")
     @ModerationBase.is_admin()
     @app_commands.describe(
@@ -30,20 +39,11 @@ class XPAdmin(commands.Cog):
         db_type: str | None = None,
     ):
         lifetime = self.parse_lifetime_arg(db_type)
-        conn, cur = get_db(lifetime)
-        cur.execute("SELECT xp FROM xp WHERE user_id = ?", (str(user.id),))
-        row = cur.fetchone()
-        old_xp = row[0] if row else 0
+        entry = await self.get_entry(interaction.guild_id, user, lifetime)
+        old_xp = entry.xp
 
-        if row:
-            cur.execute("UPDATE xp SET xp = ? WHERE user_id = ?", (amount, str(user.id)))
-        else:
-            cur.execute(
-                "INSERT INTO xp (user_id, xp, level, last_message) VALUES (?, ?, 0, ?)",
-                (str(user.id), amount, int(time.time()))
-            )
-        conn.commit()
-        conn.close()
+        entry.xp = amount
+        accumulator.mark_dirty(interaction.guild_id, str(user.id), lifetime, entry)
         await interaction.response.send_message(
             f"✅ User {user.mention} XP updated ({'lifetime' if lifetime else 'annual'}): {old_xp} → {amount}",
             ephemeral=True
@@ -64,21 +64,12 @@ class XPAdmin(commands.Cog):
         db_type: str | None = None,
     ):
         lifetime = self.parse_lifetime_arg(db_type)
-        conn, cur = get_db(lifetime)
-        cur.execute("SELECT xp FROM xp WHERE user_id = ?", (str(user.id),))
-        row = cur.fetchone()
-        old_xp = row[0] if row else 0
+        entry = await self.get_entry(interaction.guild_id, user, lifetime)
+        old_xp = entry.xp
         new_xp = old_xp + amount
 
-        if row:
-            cur.execute("UPDATE xp SET xp = ? WHERE user_id = ?", (new_xp, str(user.id)))
-        else:
-            cur.execute(
-                "INSERT INTO xp (user_id, xp, level, last_message) VALUES (?, ?, 0, ?)",
-                (str(user.id), new_xp, int(time.time()))
-            )
-        conn.commit()
-        conn.close()
+        entry.xp = new_xp
+        accumulator.mark_dirty(interaction.guild_id, str(user.id), lifetime, entry)
         await interaction.response.send_message(
             f"✅ User {user.mention} XP updated ({'lifetime' if lifetime else 'annual'}): {old_xp} → {new_xp}",
             ephemeral=True
@@ -99,15 +90,13 @@ class XPAdmin(commands.Cog):
         db_type: str | None = None,
     ):
         lifetime = self.parse_lifetime_arg(db_type)
-        conn, cur = get_db(lifetime)
-        cur.execute("SELECT xp FROM xp WHERE user_id = ?", (str(user.id),))
-        row = cur.fetchone()
-        old_xp = row[0] if row else 0
-        new_xp = max(0, old_xp - amount)
+        entry = await accumulator.aget(interaction.guild_id, str(user.id), lifetime)
 
-        if row:
-            cur.execute("UPDATE xp SET xp = ? WHERE user_id = ?", (new_xp, str(user.id)))
-            conn.commit()
+        if entry:
+            old_xp = entry.xp
+            new_xp = max(0, old_xp - amount)
+            entry.xp = new_xp
+            accumulator.mark_dirty(interaction.guild_id, str(user.id), lifetime, entry)
             await interaction.response.send_message(
                 f"✅ User {user.mention} XP updated ({'lifetime' if lifetime else 'annual'}): {old_xp} → {new_xp}",
                 ephemeral=True
@@ -117,7 +106,16 @@ class XPAdmin(commands.Cog):
                 f"⚠️ User {user.mention} has no {'lifetime' if lifetime else 'annual'} XP.",
                 ephemeral=True
             )
-        conn.close()
+
+    @app_commands.command(name="xp_reload_config", description="Reload the XP config file.")
+    @ModerationBase.is_admin()
+    async def xp_reload_config(self, interaction: discord.Interaction):
+        try:
+            config.reload()
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Failed to reload XP config: `{e}`", ephemeral=True)
+            return
+        await interaction.response.send_message("✅ XP config reloaded.", ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,50 @@
+import traceback
+from discord.ext import commands, tasks
+from .accumulator import accumulator, FLUSH_INTERVAL
+from .multipliers import multiplier_resolver
+from .roles import role_scheduler
+
+class XPEvents(commands.Cog):
+    """Background upkeep for the in-memory XP state."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.flush_task.start()
+
+    async def cog_unload(self):
+        """Stop the periodic flush and write out anything still pending."""
+        self.flush_task.cancel()
+        role_scheduler.stop()
+        try:
+            count = await accumulator.aflush()
+            print(f"Flushed {count} pending XP entries on unload")
+        except Exception as e:
+            print(f"XP flush on unload failed: {e}")
+            traceback.print_exc()
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Recompute a member's XP multiplier after their roles change"""
+        if before.roles != after.roles:
+            multiplier_resolver.invalidate(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        multiplier_resolver.invalidate(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        # Deleting a role doesn't fire on_member_update for its members
+        multiplier_resolver.invalidate(role.guild.id)
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_task(self):
+        """Write dirty XP entries to both boards in xp.db"""
+        try:
+            await accumulator.aflush()
+        except Exception as e:
+            print(f"XP flush failed: {e}")
+            traceback.print_exc()
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(XPEvents(bot))